@@ -4,57 +4,234 @@ import os
 import json
 import logging
 
+class ConfigError(ValueError):
+    """Error de validación de la configuración"""
+    pass
+
+class Setting:
+    """Definición tipada de un parámetro de configuración"""
+
+    __slots__ = ('type', 'default', 'minimum', 'maximum', 'choices')
+
+    def __init__(self, type, default, minimum=None, maximum=None, choices=None):
+        self.type = type
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+
+    def validate(self, name, value):
+        """
+        Valida y normaliza un valor
+
+        Returns:
+            Valor convertido al tipo del parámetro
+
+        Raises:
+            ConfigError: Si el valor no es válido
+        """
+        # bool es subclase de int: no se acepta como número ni al revés
+        if self.type is bool:
+            if not isinstance(value, bool):
+                raise ConfigError(f"{name} debe ser booleano, recibido {value!r}")
+        elif self.type is float:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ConfigError(f"{name} debe ser numérico, recibido {value!r}")
+            value = float(value)
+        elif isinstance(value, bool) or not isinstance(value, self.type):
+            raise ConfigError(f"{name} debe ser de tipo {self.type.__name__}, recibido {value!r}")
+
+        if self.minimum is not None and value < self.minimum:
+            raise ConfigError(f"{name} debe ser >= {self.minimum}, recibido {value}")
+        if self.maximum is not None and value > self.maximum:
+            raise ConfigError(f"{name} debe ser <= {self.maximum}, recibido {value}")
+        if self.choices is not None and value not in self.choices:
+            raise ConfigError(f"{name} debe ser uno de {self.choices}, recibido {value!r}")
+        return value
+
+SCHEMA = {
+    # Parámetros por defecto
+    'CHECK_INTERVAL': Setting(int, 60, minimum=1),  # segundos
+
+    # Parámetros de estrategia Moving Average
+    'MA_SHORT_WINDOW': Setting(int, 9, minimum=1),
+    'MA_LONG_WINDOW': Setting(int, 21, minimum=2),
+
+    # Parámetros de estrategia RSI
+    'RSI_PERIOD': Setting(int, 14, minimum=2),
+    'RSI_OVERBOUGHT': Setting(float, 70.0, minimum=0, maximum=100),
+    'RSI_OVERSOLD': Setting(float, 30.0, minimum=0, maximum=100),
+
+    # Parámetros del modo scalping por ticks
+    'SCALP_BAR_MS': Setting(int, 1000, minimum=1),  # duración de cada micro-barra
+    'SCALP_FAST_EMA': Setting(int, 5, minimum=1),
+    'SCALP_SLOW_EMA': Setting(int, 20, minimum=2),
+    'SCALP_MAX_SPREAD': Setting(float, 0.0005, minimum=0),  # 0.05% de spread máximo
+    'SCALP_LATENCY_BUDGET_US': Setting(int, 300, minimum=1),  # presupuesto por evento
+    'SCALP_SIGNAL_COOLDOWN': Setting(float, 5.0, minimum=0),  # segundos entre órdenes
+
+    # Gestión de riesgos
+    'MAX_POSITION_SIZE': Setting(float, 0.1, minimum=0, maximum=1),  # 10% del balance disponible
+    'STOP_LOSS_PERCENT': Setting(float, 0.02, minimum=0, maximum=1),  # 2% de stop loss
+    'TAKE_PROFIT_PERCENT': Setting(float, 0.04, minimum=0),  # 4% de take profit
+
+    # Configuración de trading
+    'LEVERAGE': Setting(int, 2, minimum=1, maximum=125),  # Apalancamiento
+    'ORDER_TYPE': Setting(str, 'MARKET', choices=('MARKET', 'LIMIT')),  # Tipo de orden
+    'HEDGE_MODE': Setting(bool, False),  # Posiciones LONG y SHORT independientes
+
+    # Persistencia
+    'CHECKPOINT_INTERVAL': Setting(int, 60, minimum=1),  # segundos entre snapshots de estado
+}
+
+# Pares de parámetros donde el primero debe ser estrictamente menor que el segundo
+ORDERED_PAIRS = (
+    ('MA_SHORT_WINDOW', 'MA_LONG_WINDOW'),
+    ('RSI_OVERSOLD', 'RSI_OVERBOUGHT'),
+    ('SCALP_FAST_EMA', 'SCALP_SLOW_EMA'),
+)
+
+# Parámetros que solo se aplican al arrancar el bot
+RESTART_REQUIRED = ('HEDGE_MODE',)
+
 class Config:
+    """Configuración tipada del bot con sobrescrituras por símbolo"""
+
+    __slots__ = tuple(SCHEMA) + ('SYMBOLS',)
+
     def __init__(self):
-        # Parámetros por defecto
-        self.CHECK_INTERVAL = 60  # segundos
-        
-        # Parámetros de estrategia Moving Average
-        self.MA_SHORT_WINDOW = 9
-        self.MA_LONG_WINDOW = 21
-        
-        # Parámetros de estrategia RSI
-        self.RSI_PERIOD = 14
-        self.RSI_OVERBOUGHT = 70
-        self.RSI_OVERSOLD = 30
-        
-        # Gestión de riesgos
-        self.MAX_POSITION_SIZE = 0.1  # 10% del balance disponible
-        self.STOP_LOSS_PERCENT = 0.02  # 2% de stop loss
-        self.TAKE_PROFIT_PERCENT = 0.04  # 4% de take profit
-        
-        # Configuración de trading
-        self.LEVERAGE = 2  # Apalancamiento
-        self.ORDER_TYPE = 'MARKET'  # Tipo de orden: MARKET o LIMIT
-        
+        for name, setting in SCHEMA.items():
+            setattr(self, name, setting.default)
+
+        # Sobrescrituras por símbolo: {"ETHUSDT": {"LEVERAGE": 3}}
+        self.SYMBOLS = {}
+
+    def to_dict(self):
+        """Devuelve la configuración como diccionario serializable"""
+        config_data = {name: getattr(self, name) for name in SCHEMA}
+        config_data['SYMBOLS'] = {symbol: dict(overrides) for symbol, overrides in self.SYMBOLS.items()}
+        return config_data
+
+    def validate(self, config_data):
+        """
+        Valida un diccionario de configuración completo
+
+        Args:
+            config_data: Parámetros a validar (los ausentes toman su valor por defecto)
+
+        Returns:
+            dict: Configuración completa validada y normalizada
+
+        Raises:
+            ConfigError: Con todos los errores encontrados
+        """
+        errors = []
+        # Se parte de los valores por defecto para que el archivo describa toda la configuración
+        values = {name: setting.default for name, setting in SCHEMA.items()}
+
+        for key, value in config_data.items():
+            if key == 'SYMBOLS':
+                continue
+            if key not in SCHEMA:
+                errors.append(f"Parámetro desconocido: {key}")
+                continue
+            try:
+                values[key] = SCHEMA[key].validate(key, value)
+            except ConfigError as e:
+                errors.append(str(e))
+
+        errors.extend(self._check_pairs(values))
+
+        symbols = config_data.get('SYMBOLS', {})
+        if not isinstance(symbols, dict):
+            errors.append("SYMBOLS debe ser un objeto {símbolo: parámetros}")
+            symbols = {}
+
+        values['SYMBOLS'] = {}
+        for symbol, overrides in symbols.items():
+            if not isinstance(overrides, dict):
+                errors.append(f"SYMBOLS.{symbol} debe ser un objeto de parámetros")
+                continue
+            validated = {}
+            for key, value in overrides.items():
+                if key not in SCHEMA:
+                    errors.append(f"Parámetro desconocido en SYMBOLS.{symbol}: {key}")
+                    continue
+                try:
+                    validated[key] = SCHEMA[key].validate(f"SYMBOLS.{symbol}.{key}", value)
+                except ConfigError as e:
+                    errors.append(str(e))
+            errors.extend(f"SYMBOLS.{symbol}: {error}" for error in self._check_pairs({**values, **validated}, validated))
+            values['SYMBOLS'][symbol] = validated
+
+        if errors:
+            raise ConfigError('; '.join(errors))
+        return values
+
+    @staticmethod
+    def _check_pairs(values, only=None):
+        # Con only se comprueban solo los pares que incluyen alguno de esos parámetros
+        return [
+            f"{lower} ({values[lower]}) debe ser menor que {upper} ({values[upper]})"
+            for lower, upper in ORDERED_PAIRS
+            if values[lower] >= values[upper] and (only is None or lower in only or upper in only)
+        ]
+
+    def update(self, config_data):
+        """
+        Valida y aplica parámetros en el mismo objeto
+
+        Los cambios solo se aplican si todo el conjunto es válido.
+
+        Returns:
+            list: Nombres de los parámetros que cambiaron
+
+        Raises:
+            ConfigError: Si algún parámetro no es válido
+        """
+        values = self.validate(config_data)
+        changed = [name for name, value in values.items() if getattr(self, name) != value]
+        for name in changed:
+            setattr(self, name, values[name])
+        return changed
+
+    def for_symbol(self, symbol):
+        """Devuelve una copia de la configuración con las sobrescrituras del símbolo aplicadas"""
+        config = Config()
+        for name in SCHEMA:
+            setattr(config, name, getattr(self, name))
+        config.SYMBOLS = self.SYMBOLS
+        for name, value in self.SYMBOLS.get(symbol, {}).items():
+            setattr(config, name, value)
+        return config
+
     def load_config(self, config_file='config/settings.json'):
         """Carga la configuración desde un archivo JSON"""
         if os.path.exists(config_file):
             try:
                 with open(config_file, 'r') as f:
                     config_data = json.load(f)
-                
-                # Actualizar atributos desde el archivo
-                for key, value in config_data.items():
-                    if hasattr(self, key):
-                        setattr(self, key, value)
-                
+
+                # Se valida todo antes de modificar ningún atributo
+                self.update(config_data)
+
                 logging.info(f"Configuración cargada desde {config_file}")
+                return True
             except Exception as e:
                 logging.error(f"Error al cargar la configuración: {e}")
         else:
             logging.warning(f"Archivo de configuración {config_file} no encontrado. Usando valores por defecto.")
-            
+        return False
+
     def save_config(self, config_file='config/settings.json'):
         """Guarda la configuración actual en un archivo JSON"""
-        config_data = {attr: getattr(self, attr) for attr in dir(self) 
-                      if not attr.startswith('__') and not callable(getattr(self, attr))}
-        
+        config_data = self.to_dict()
+
         os.makedirs(os.path.dirname(config_file), exist_ok=True)
-        
+
         try:
             with open(config_file, 'w') as f:
                 json.dump(config_data, f, indent=4)
             logging.info(f"Configuración guardada en {config_file}")
         except Exception as e:
-            logging.error(f"Error al guardar la configuración: {e}") 
\ No newline at end of file
+            logging.error(f"Error al guardar la configuración: {e}")
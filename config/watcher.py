@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import logging
+from config.config import ConfigError, RESTART_REQUIRED
+
+class ConfigWatcher:
+    """Vigila el archivo de configuración y aplica los cambios en caliente"""
+
+    def __init__(self, config, config_file='config/settings.json', interval=1.0):
+        """
+        Inicializa el vigilante
+
+        Args:
+            config: Config en uso (se actualiza en el mismo objeto)
+            config_file: Archivo de configuración a vigilar
+            interval: Segundos mínimos entre comprobaciones del archivo
+        """
+        self.config = config
+        self.config_file = config_file
+        self.interval = interval
+        self.subscribers = []
+        self.logger = logging.getLogger(__name__)
+        self._last_check = time.monotonic()
+        self._mtime = self._stat()
+
+    def subscribe(self, callback, symbol=None):
+        """
+        Registra una función que recibe la configuración tras cada recarga
+
+        Args:
+            callback: Función que recibe un Config (p. ej. strategy.apply_config)
+            symbol: Si se indica, recibe la configuración con las sobrescrituras del símbolo
+        """
+        self.subscribers.append((callback, symbol))
+
+    def _stat(self):
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self):
+        """
+        Comprueba si el archivo cambió; pensado para llamarse en cada iteración del bucle
+
+        Returns:
+            list: Parámetros que cambiaron (vacía si no hubo recarga)
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return []
+        self._last_check = now
+
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return []
+        self._mtime = mtime
+
+        return self.reload()
+
+    def reload(self):
+        """
+        Relee el archivo y aplica los cambios a la configuración y a los suscriptores
+
+        Returns:
+            list: Parámetros que cambiaron
+        """
+        try:
+            with open(self.config_file, 'r') as f:
+                config_data = json.load(f)
+            changed = self.config.update(config_data)
+        except (OSError, ValueError, ConfigError) as e:
+            # Un archivo inválido o a medio escribir no modifica la configuración en uso
+            self.logger.error(f"Configuración no recargada: {e}")
+            return []
+
+        if not changed:
+            return []
+
+        self.logger.info(f"Configuración recargada, parámetros modificados: {', '.join(changed)}")
+        pending = [name for name in changed if name in RESTART_REQUIRED]
+        if pending:
+            self.logger.warning(f"Los cambios en {', '.join(pending)} no se aplican hasta reiniciar el bot")
+        for callback, symbol in self.subscribers:
+            try:
+                callback(self.config.for_symbol(symbol) if symbol else self.config)
+            except Exception as e:
+                self.logger.error(f"Error al aplicar la configuración recargada: {e}")
+        return changed
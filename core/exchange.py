@@ -3,13 +3,38 @@
 import logging
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
-from config.credentials import API_KEY, API_SECRET
+from core.user_stream import UserDataStream
+from data.recorder import RecordingClient
 
 class BinanceClient:
-    def __init__(self, test_mode=False):
-        self.client = Client(API_KEY, API_SECRET)
+    # Velas pedidas en una actualización incremental (peso mínimo en la API)
+    KLINE_INCREMENTAL_LIMIT = 99
+    # Velas conservadas por símbolo e intervalo
+    KLINE_CACHE_SIZE = 1000
+    
+    def __init__(self, test_mode=False, client=None, recorder=None):
+        """
+        Inicializa el cliente
+
+        Args:
+            test_mode: Si es True las órdenes solo se registran en el log
+            client: Cliente compatible con python-binance (p. ej. SimulatedClient); por defecto uno real
+            recorder: Recorder opcional que graba todas las respuestas del exchange
+        """
+        if client is None:
+            # Las credenciales solo se exigen al conectar con el exchange real
+            from config.credentials import API_KEY, API_SECRET
+            client = Client(API_KEY, API_SECRET)
+        if recorder is not None:
+            client = RecordingClient(client, recorder)
+        
+        self.client = client
+        self.recorder = recorder
         self.test_mode = test_mode
         self.logger = logging.getLogger(__name__)
+        self.user_stream = None
+        self.hedge_mode = False
+        self.kline_cache = {}  # (symbol, interval) -> velas
         
         # Verificar conexión
         try:
@@ -18,9 +43,33 @@ class BinanceClient:
         except BinanceAPIException as e:
             self.logger.error(f"Error al conectar con Binance: {e}")
             raise
+        
+        # Detectar modo de posición de la cuenta
+        try:
+            self.hedge_mode = bool(self.client.futures_get_position_mode()['dualSidePosition'])
+        except BinanceAPIException as e:
+            self.logger.error(f"Error al obtener modo de posición: {e}")
+    
+    def start_user_stream(self):
+        """Arranca el user-data stream para responder balances y posiciones desde memoria"""
+        if self.user_stream is None:
+            self.user_stream = UserDataStream(self.client, recorder=self.recorder)
+            self.user_stream.start()
+        return self.user_stream
+    
+    def stop_user_stream(self):
+        """Detiene el user-data stream y vuelve a consultar por REST"""
+        if self.user_stream:
+            self.user_stream.stop()
+            self.user_stream = None
     
     def get_account_balance(self, asset='USDT'):
         """Obtiene el balance de una moneda específica"""
+        if self.user_stream and self.user_stream.synced:
+            balance = self.user_stream.state.get_available_balance(asset)
+            if balance is not None:
+                return balance
+        
         try:
             futures_account = self.client.futures_account()
             for balance in futures_account['assets']:
@@ -40,39 +89,80 @@ class BinanceClient:
             self.logger.error(f"Error al obtener precio de mercado: {e}")
             return None
     
+    @staticmethod
+    def _parse_klines(klines):
+        return [
+            {
+                'timestamp': k[0],
+                'open': float(k[1]),
+                'high': float(k[2]),
+                'low': float(k[3]),
+                'close': float(k[4]),
+                'volume': float(k[5])
+            }
+            for k in klines
+        ]
+    
     def get_historical_klines(self, symbol, interval, limit=100):
-        """Obtiene velas históricas para un símbolo e intervalo"""
+        """Obtiene velas históricas; con la caché llena solo descarga las velas nuevas"""
+        key = (symbol, interval)
+        cached = self.kline_cache.get(key)
         try:
-            klines = self.client.futures_klines(symbol=symbol, interval=interval, limit=limit)
-            return [
-                {
-                    'timestamp': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                }
-                for k in klines
-            ]
+            candles = None
+            if cached and len(cached) >= limit:
+                # La última vela cacheada puede seguir abierta: se pide de nuevo desde ella
+                fresh = self._parse_klines(self.client.futures_klines(
+                    symbol=symbol, interval=interval, startTime=cached[-1]['timestamp'],
+                    limit=self.KLINE_INCREMENTAL_LIMIT
+                ))
+                # Si faltan más velas de las pedidas hay un hueco y se descarga todo
+                if fresh and fresh[0]['timestamp'] == cached[-1]['timestamp'] and len(fresh) < self.KLINE_INCREMENTAL_LIMIT:
+                    candles = cached[:-1] + fresh
+            
+            if candles is None:
+                candles = self._parse_klines(self.client.futures_klines(symbol=symbol, interval=interval, limit=limit))
+            
+            self.kline_cache[key] = candles[-max(limit, self.KLINE_CACHE_SIZE):]
+            return candles[-limit:]
         except BinanceAPIException as e:
             self.logger.error(f"Error al obtener datos históricos: {e}")
             return []
     
-    def place_order(self, symbol, side, quantity, order_type='MARKET', price=None, reduce_only=False):
+    def get_kline_state(self):
+        """Devuelve la caché de velas en formato serializable para los snapshots"""
+        return {f"{symbol}|{interval}": candles for (symbol, interval), candles in self.kline_cache.items()}
+    
+    def set_kline_state(self, state):
+        """Restaura la caché de velas desde un snapshot"""
+        # Con la caché restaurada las primeras peticiones son incrementales: el simulador
+        # necesita la misma caché para que coincidan con las grabadas
+        if self.recorder:
+            self.recorder.record_state('klines', state)
+        for key, candles in state.items():
+            symbol, interval = key.split('|', 1)
+            self.kline_cache[(symbol, interval)] = candles
+    
+    def place_order(self, symbol, side, quantity, order_type='MARKET', price=None, reduce_only=False,
+                    position_side=None):
         """Coloca una orden en el mercado de futuros"""
         if self.test_mode:
-            self.logger.info(f"[TEST MODE] Orden: {side} {quantity} {symbol} a {price if price else 'precio de mercado'}")
+            leg = f" [{position_side}]" if position_side else ''
+            self.logger.info(f"[TEST MODE] Orden: {side} {quantity} {symbol}{leg} a {price if price else 'precio de mercado'}")
             return {"orderId": "test", "status": "TEST"}
         
         try:
             params = {
                 'symbol': symbol,
                 'side': side,  # 'BUY' o 'SELL'
-                'quantity': quantity,
-                'reduceOnly': reduce_only
+                'quantity': quantity
             }
             
+            # En modo hedge la pata se indica con positionSide y Binance rechaza reduceOnly
+            if position_side in ('LONG', 'SHORT'):
+                params['positionSide'] = position_side
+            else:
+                params['reduceOnly'] = reduce_only
+            
             if order_type == 'LIMIT' and price:
                 params['type'] = 'LIMIT'
                 params['price'] = price
@@ -97,20 +187,55 @@ class BinanceClient:
             self.logger.error(f"Error al configurar apalancamiento: {e}")
             return None
     
-    def get_position(self, symbol):
-        """Obtiene la posición actual para un símbolo"""
+    def set_position_mode(self, hedge_mode):
+        """Activa o desactiva el modo hedge (posiciones LONG y SHORT independientes)"""
         try:
-            positions = self.client.futures_position_information(symbol=symbol)
+            self.client.futures_change_position_mode(dualSidePosition='true' if hedge_mode else 'false')
+            self.logger.info(f"Modo de posición configurado a {'hedge' if hedge_mode else 'one-way'}")
+        except BinanceAPIException as e:
+            # -4059: la cuenta ya está en el modo solicitado
+            if e.code != -4059:
+                self.logger.error(f"Error al configurar modo de posición: {e}")
+                return self.hedge_mode
+        self.hedge_mode = hedge_mode
+        return self.hedge_mode
+    
+    def get_positions(self, symbol):
+        """Obtiene las patas de un símbolo indexadas por positionSide (BOTH, LONG o SHORT)"""
+        if self.user_stream and self.user_stream.synced:
+            positions = self.user_stream.state.get_positions(symbol)
             if positions:
-                position = positions[0]
-                return {
+                return positions
+        
+        try:
+            return {
+                position['positionSide']: {
                     'symbol': position['symbol'],
                     'amount': float(position['positionAmt']),
                     'entry_price': float(position['entryPrice']),
                     'unrealized_pnl': float(position['unRealizedProfit']),
                     'leverage': int(position['leverage'])
                 }
-            return None
+                for position in self.client.futures_position_information(symbol=symbol)
+            }
         except BinanceAPIException as e:
-            self.logger.error(f"Error al obtener posición: {e}")
-            return None 
\ No newline at end of file
+            self.logger.error(f"Error al obtener posiciones: {e}")
+            return {}
+    
+    def get_position(self, symbol):
+        """Obtiene la posición neta actual para un símbolo"""
+        positions = self.get_positions(symbol)
+        if not positions:
+            return None
+        if len(positions) == 1:
+            return next(iter(positions.values()))
+        
+        # En modo hedge se agregan ambas patas; el precio de entrada es el de la pata dominante
+        dominant = max(positions.values(), key=lambda position: abs(position['amount']))
+        return {
+            'symbol': symbol,
+            'amount': sum(position['amount'] for position in positions.values()),
+            'entry_price': dominant['entry_price'],
+            'unrealized_pnl': sum(position['unrealized_pnl'] for position in positions.values()),
+            'leverage': dominant['leverage']
+        }
\ No newline at end of file
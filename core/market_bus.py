@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import struct
+from multiprocessing import shared_memory
+
+KIND_CANDLE = 1
+KIND_TRADE = 2
+KIND_BOOK = 3
+
+# Cabecera: número de secuencia del último registro publicado
+HEADER = struct.Struct('<Q')
+# Registro: [secuencia][tipo][id de símbolo][timestamp ms][5 valores]
+#   vela:  open, high, low, close, volume
+#   trade: price, quantity, buyer_maker, 0, 0
+#   libro: bid, bid_qty, ask, ask_qty, 0
+RECORD = struct.Struct('<QBxHxxxxq5d')
+SEQUENCE = struct.Struct('<Q')
+
+class MarketBus:
+    """Buffer circular en memoria compartida con un único escritor y varios lectores"""
+
+    def __init__(self, name=None, capacity=65536, create=False):
+        """
+        Crea o abre el bus
+
+        Args:
+            name: Nombre del segmento de memoria compartida (obligatorio al abrir)
+            capacity: Número de registros del buffer (solo al crear)
+            create: True para crear el segmento, False para abrir uno existente
+        """
+        if create:
+            size = HEADER.size + capacity * RECORD.size
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._shm.buf[:HEADER.size] = bytes(HEADER.size)
+            self.capacity = capacity
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.capacity = (self._shm.size - HEADER.size) // RECORD.size
+
+        self.name = self._shm.name
+        self.buf = self._shm.buf
+        self._owner = create
+        self._sequence = HEADER.unpack_from(self.buf, 0)[0]
+
+    def publish(self, kind, symbol_id, timestamp, a=0.0, b=0.0, c=0.0, d=0.0, e=0.0):
+        """
+        Publica un registro (solo debe llamarlo el proceso escritor)
+
+        El slot se marca con secuencia 0 mientras se escribe para que los lectores
+        descarten lecturas a medias.
+        """
+        sequence = self._sequence + 1
+        offset = HEADER.size + (sequence % self.capacity) * RECORD.size
+        SEQUENCE.pack_into(self.buf, offset, 0)
+        RECORD.pack_into(self.buf, offset, 0, kind, symbol_id, timestamp, a, b, c, d, e)
+        SEQUENCE.pack_into(self.buf, offset, sequence)
+        HEADER.pack_into(self.buf, 0, sequence)
+        self._sequence = sequence
+
+    def reader(self, from_start=False):
+        """Devuelve un lector posicionado en el último registro publicado"""
+        return BusReader(self, 0 if from_start else HEADER.unpack_from(self.buf, 0)[0])
+
+    def close(self):
+        """Libera el segmento; el proceso creador además lo elimina"""
+        self.buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+class BusReader:
+    """Cursor de lectura independiente sobre un MarketBus"""
+
+    __slots__ = ('bus', 'cursor', 'lapped')
+
+    def __init__(self, bus, cursor):
+        self.bus = bus
+        self.cursor = cursor
+        self.lapped = 0  # registros perdidos por no leer a tiempo
+
+    def poll(self, max_items=1024):
+        """
+        Lee los registros nuevos
+
+        Args:
+            max_items: Máximo de registros a devolver
+
+        Returns:
+            list: Tuplas (tipo, id de símbolo, timestamp, a, b, c, d, e)
+        """
+        buf = self.bus.buf
+        capacity = self.bus.capacity
+        head = HEADER.unpack_from(buf, 0)[0]
+
+        # Si el escritor dio la vuelta al buffer se saltan los registros sobrescritos
+        if head - self.cursor > capacity:
+            self.lapped += head - self.cursor - capacity
+            self.cursor = head - capacity
+
+        items = []
+        while self.cursor < head and len(items) < max_items:
+            sequence = self.cursor + 1
+            offset = HEADER.size + (sequence % capacity) * RECORD.size
+            record = RECORD.unpack_from(buf, offset)
+            self.cursor = sequence
+            if record[0] != sequence or SEQUENCE.unpack_from(buf, offset)[0] != sequence:
+                self.lapped += 1
+                continue
+            items.append(record[1:])
+        return items
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+def net_exposure(positions):
+    """
+    Calcula la exposición neta a partir de las patas de un símbolo
+
+    Args:
+        positions: Diccionario position_side -> posición (ver BinanceClient.get_positions)
+
+    Returns:
+        float: Cantidad neta (positiva larga, negativa corta)
+    """
+    return sum(position['amount'] for position in positions.values())
+
+def plan_orders(target, positions, hedge_mode=False, precision=3):
+    """
+    Calcula las órdenes mínimas para llevar la exposición neta a un objetivo
+
+    En modo one-way un cambio de dirección se hace con una única orden por la
+    diferencia en lugar de cerrar y reabrir. En modo hedge primero se reduce la
+    pata contraria y solo el remanente abre o amplía la pata a favor, de modo
+    que nunca se mantiene nocional bruto innecesario.
+
+    Args:
+        target: Exposición neta objetivo (positiva larga, negativa corta)
+        positions: Diccionario position_side -> posición
+        hedge_mode: True si la cuenta opera en modo hedge
+        precision: Decimales de las cantidades
+
+    Returns:
+        list: Órdenes con side, quantity, position_side y reduce_only
+    """
+    orders = []
+
+    if not hedge_mode:
+        current = net_exposure(positions)
+        delta = round(target - current, precision)
+        if delta == 0:
+            return orders
+
+        # Solo reduce si el objetivo no cruza cero ni supera la posición actual
+        reduce_only = current != 0 and target * current >= 0 and abs(target) < abs(current)
+        orders.append({
+            'side': 'BUY' if delta > 0 else 'SELL',
+            'quantity': abs(delta),
+            'position_side': None,
+            'reduce_only': reduce_only
+        })
+        return orders
+
+    long_amount = positions['LONG']['amount'] if 'LONG' in positions else 0.0
+    short_amount = -positions['SHORT']['amount'] if 'SHORT' in positions else 0.0
+    delta = round(target - (long_amount - short_amount), precision)
+    if delta == 0:
+        return orders
+
+    if delta > 0:
+        side, opposite_leg, opposite_amount, own_leg = 'BUY', 'SHORT', short_amount, 'LONG'
+    else:
+        side, opposite_leg, opposite_amount, own_leg = 'SELL', 'LONG', long_amount, 'SHORT'
+
+    remaining = abs(delta)
+    reduce_quantity = round(min(opposite_amount, remaining), precision)
+    if reduce_quantity > 0:
+        orders.append({
+            'side': side,
+            'quantity': reduce_quantity,
+            'position_side': opposite_leg,
+            'reduce_only': True
+        })
+        remaining = round(remaining - reduce_quantity, precision)
+
+    if remaining > 0:
+        orders.append({
+            'side': side,
+            'quantity': remaining,
+            'position_side': own_leg,
+            'reduce_only': False
+        })
+
+    return orders
+
+class OrderRouter:
+    """Enruta cambios de exposición por el camino con menos órdenes y menos nocional"""
+
+    def __init__(self, client, precision=3):
+        """
+        Inicializa el enrutador
+
+        Args:
+            client: Cliente de Binance
+            precision: Decimales de las cantidades
+        """
+        self.client = client
+        self.precision = precision
+        self.journal = None
+        self.logger = logging.getLogger(__name__)
+
+    def route(self, symbol, target, positions=None):
+        """
+        Lleva la exposición neta de un símbolo al objetivo indicado
+
+        Args:
+            symbol: Símbolo de trading
+            target: Exposición neta objetivo (positiva larga, negativa corta)
+            positions: Patas actuales (se consultan si no se indican)
+
+        Returns:
+            list: Respuestas de las órdenes enviadas
+        """
+        if positions is None:
+            positions = self.client.get_positions(symbol)
+
+        orders = plan_orders(target, positions, self.client.hedge_mode, self.precision)
+        results = []
+        for order in orders:
+            result = self.client.place_order(
+                symbol=symbol,
+                side=order['side'],
+                quantity=order['quantity'],
+                reduce_only=order['reduce_only'],
+                position_side=order['position_side']
+            )
+            results.append(result)
+
+            if self.journal:
+                self.journal.record_order(
+                    symbol, order['side'], order['quantity'], order['reduce_only'], order['position_side'],
+                    result if isinstance(result, dict) else None, test=self.client.test_mode
+                )
+
+            action = 'reducida' if order['reduce_only'] else 'abierta'
+            leg = order['position_side'] or 'neta'
+            self.logger.info(f"Posición {leg} {action}: {order['side']} {order['quantity']} {symbol}")
+
+        return results
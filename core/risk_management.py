@@ -21,10 +21,21 @@ class RiskManager:
         self.take_profit_percent = take_profit_percent
         self.logger = logging.getLogger(__name__)
     
-    def calculate_position_size(self, symbol, asset='USDT'):
+    def apply_config(self, config):
+        """Actualiza los parámetros de riesgo desde una configuración recargada"""
+        self.max_position_size = config.MAX_POSITION_SIZE
+        self.stop_loss_percent = config.STOP_LOSS_PERCENT
+        self.take_profit_percent = config.TAKE_PROFIT_PERCENT
+    
+    def calculate_position_size(self, symbol, asset='USDT', price=None):
         """
         Calcula el tamaño de posición basado en el balance disponible y el riesgo máximo
         
+        Args:
+            symbol: Símbolo de trading
+            asset: Moneda del balance
+            price: Precio de referencia (se consulta al mercado si no se indica)
+        
         Returns:
             float: Cantidad a comprar/vender
         """
@@ -33,7 +44,8 @@ class RiskManager:
             balance = self.client.get_account_balance(asset)
             
             # Obtener precio actual
-            price = self.client.get_market_price(symbol)
+            if price is None:
+                price = self.client.get_market_price(symbol)
             
             if not balance or not price:
                 return 0
@@ -52,6 +64,12 @@ class RiskManager:
             self.logger.error(f"Error al calcular tamaño de posición: {e}")
             return 0
     
+    def _position_side(self, side):
+        """Devuelve la pata de la posición abierta con side en modo hedge o None en one-way"""
+        if not self.client.hedge_mode:
+            return None
+        return 'LONG' if side == 'BUY' else 'SHORT'
+    
     def set_stop_loss(self, symbol, entry_price, side):
         """
         Establece un stop loss para la posición
@@ -69,8 +87,9 @@ class RiskManager:
                 stop_price = entry_price * (1 + self.stop_loss_percent)
                 order_side = 'BUY'
             
-            # Obtener posición actual
-            position = self.client.get_position(symbol)
+            # Obtener la pata afectada (la neta en modo one-way)
+            position_side = self._position_side(side)
+            position = self.client.get_positions(symbol).get(position_side or 'BOTH')
             if not position or position['amount'] == 0:
                 return
             
@@ -81,7 +100,8 @@ class RiskManager:
                 quantity=abs(position['amount']),
                 order_type='STOP_MARKET',
                 price=stop_price,
-                reduce_only=True
+                reduce_only=True,
+                position_side=position_side
             )
             
             self.logger.info(f"Stop loss establecido a {stop_price} para {symbol}")
@@ -105,8 +125,9 @@ class RiskManager:
                 take_profit_price = entry_price * (1 - self.take_profit_percent)
                 order_side = 'BUY'
             
-            # Obtener posición actual
-            position = self.client.get_position(symbol)
+            # Obtener la pata afectada (la neta en modo one-way)
+            position_side = self._position_side(side)
+            position = self.client.get_positions(symbol).get(position_side or 'BOTH')
             if not position or position['amount'] == 0:
                 return
             
@@ -117,7 +138,8 @@ class RiskManager:
                 quantity=abs(position['amount']),
                 order_type='TAKE_PROFIT_MARKET',
                 price=take_profit_price,
-                reduce_only=True
+                reduce_only=True,
+                position_side=position_side
             )
             
             self.logger.info(f"Take profit establecido a {take_profit_price} para {symbol}")
@@ -0,0 +1,704 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import heapq
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import defaultdict
+from config.config import Config
+from core.strategy import Strategy
+from core.market_bus import MarketBus, KIND_CANDLE, KIND_TRADE, KIND_BOOK
+from core.tick_stream import ScalpingEngine, TickStream, parse_tick
+from data.recorder import Recorder
+from utils.logger import setup_logger
+
+# Coste relativo estimado de cada estrategia mientras no haya mediciones
+DEFAULT_COSTS = {'ma': 1.0, 'rsi': 1.0, 'scalp': 5.0}
+
+def task_key(symbol, strategy):
+    return f"{symbol}:{strategy}"
+
+def estimate_costs(tasks, costs=None):
+    """
+    Completa el coste de las tareas sin medición en las mismas unidades que las medidas
+
+    DEFAULT_COSTS es relativo: se escala con la mediana de la relación entre el
+    coste medido (ms de CPU por segundo) y el relativo de las tareas ya medidas.
+
+    Args:
+        tasks: Lista de tuplas (symbol, strategy)
+        costs: Coste medido por task_key
+
+    Returns:
+        dict: Coste de cada task_key de tasks
+    """
+    costs = costs or {}
+    ratios = sorted(
+        costs[task_key(symbol, strategy)] / DEFAULT_COSTS.get(strategy, 1.0)
+        for symbol, strategy in tasks if task_key(symbol, strategy) in costs
+    )
+    scale = ratios[len(ratios) // 2] if ratios else 1.0
+    return {
+        task_key(symbol, strategy): costs.get(task_key(symbol, strategy), DEFAULT_COSTS.get(strategy, 1.0) * scale)
+        for symbol, strategy in tasks
+    }
+
+def _task_cost(task, costs):
+    return costs[task_key(*task)]
+
+def assign_shards(tasks, workers, costs=None):
+    """
+    Reparte las tareas entre workers equilibrando la carga (primero las más costosas)
+
+    Args:
+        tasks: Lista de tuplas (symbol, strategy)
+        workers: Número de workers
+        costs: Coste medido por task_key (se estima con DEFAULT_COSTS si falta)
+
+    Returns:
+        list: Una lista de tareas por worker
+    """
+    costs = estimate_costs(tasks, costs)
+    assignment = [[] for _ in range(workers)]
+    loads = [(0.0, worker) for worker in range(workers)]
+    heapq.heapify(loads)
+
+    for task in sorted(tasks, key=lambda task: _task_cost(task, costs), reverse=True):
+        load, worker = heapq.heappop(loads)
+        assignment[worker].append(task)
+        heapq.heappush(loads, (load + _task_cost(task, costs), worker))
+
+    return assignment
+
+def plan_rebalance(assignment, costs, max_moves=4, tolerance=0.1):
+    """
+    Calcula los movimientos mínimos para reducir la carga del worker más ocupado
+
+    Cada movimiento lleva una tarea del worker más cargado al menos cargado,
+    eligiendo la que deja ambos más cerca del equilibrio.
+
+    Args:
+        assignment: Tareas actuales por worker
+        costs: Coste medido por task_key (se estima con DEFAULT_COSTS si falta)
+        max_moves: Máximo de tareas a mover
+        tolerance: Desequilibrio relativo que se tolera sin mover nada
+
+    Returns:
+        list: Tuplas (tarea, worker origen, worker destino)
+    """
+    assignment = [list(shard) for shard in assignment]
+    costs = estimate_costs([task for shard in assignment for task in shard], costs)
+    moves = []
+
+    for _ in range(max_moves):
+        loads = [sum(_task_cost(task, costs) for task in shard) for shard in assignment]
+        source = max(range(len(loads)), key=loads.__getitem__)
+        target = min(range(len(loads)), key=loads.__getitem__)
+        gap = loads[source] - loads[target]
+        if gap <= tolerance * loads[source]:
+            break
+
+        candidates = [task for task in assignment[source] if 0 < _task_cost(task, costs) < gap]
+        if not candidates:
+            break
+
+        task = min(candidates, key=lambda task: abs(gap / 2 - _task_cost(task, costs)))
+        assignment[source].remove(task)
+        assignment[target].append(task)
+        moves.append((task, source, target))
+
+    return moves
+
+class RateLimiter:
+    """Token bucket para respetar los límites de peticiones del exchange"""
+
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+            rate: Peticiones por segundo sostenidas
+            burst: Peticiones que se pueden hacer de golpe (rate por defecto)
+        """
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        # El user-data stream también consume peticiones desde sus hilos
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Espera hasta disponer de tokens y los consume"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < tokens:
+                time.sleep((tokens - self.tokens) / self.rate)
+                self.tokens = tokens
+                self.updated = time.monotonic()
+            self.tokens -= tokens
+
+class RateLimitedClient:
+    """Envuelve un cliente de python-binance consumiendo un token por cada petición REST"""
+
+    def __init__(self, client, limiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        limiter = self._limiter
+
+        def call(*args, **kwargs):
+            limiter.acquire()
+            return attr(*args, **kwargs)
+
+        setattr(self, name, call)
+        return call
+
+class GatewayClient:
+    """Cliente de un worker: datos de mercado desde el bus y operaciones a través del gateway"""
+
+    def __init__(self, worker_id, request_queue, response_queue, history=500, timeout=10):
+        """
+        Args:
+            worker_id: Identificador del worker
+            request_queue: Cola de peticiones al gateway
+            response_queue: Cola de respuestas de este worker
+            history: Velas a conservar por símbolo
+            timeout: Segundos máximos de espera de una respuesta
+        """
+        self.worker_id = worker_id
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.history = history
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self.klines = {}  # symbol -> velas ordenadas
+        self.prices = {}  # symbol -> último precio negociado
+        self._request_id = 0
+        self.hedge_mode = bool(self._call('hedge_mode'))
+
+    def _call(self, method, *args, **kwargs):
+        """Envía una petición al gateway y espera su respuesta"""
+        self._request_id += 1
+        request_id = self._request_id
+        self.request_queue.put((self.worker_id, request_id, method, args, kwargs))
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                response_id, result = self.response_queue.get(timeout=max(remaining, 0.001))
+            except queue.Empty:
+                self.logger.error(f"Sin respuesta del gateway para {method}")
+                return None
+            # Las respuestas de peticiones que ya expiraron se descartan
+            if response_id == request_id:
+                return result
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+    def record_signal(self, symbol, strategy, signal):
+        """Envía una señal al diario del gateway sin esperar respuesta"""
+        self.request_queue.put((self.worker_id, None, 'record_signal', (symbol, strategy, signal), {}))
+
+    def add_candle(self, symbol, candle):
+        """Añade una vela cerrada recibida por el bus"""
+        candles = self.klines.get(symbol)
+        if candles is None:
+            return
+        if candles and candles[-1]['timestamp'] == candle['timestamp']:
+            candles[-1] = candle
+        elif not candles or candles[-1]['timestamp'] < candle['timestamp']:
+            candles.append(candle)
+            if len(candles) > self.history:
+                del candles[0]
+
+    def get_historical_klines(self, symbol, interval, limit=100):
+        """Devuelve velas de la caché local; solo pide historia al gateway si faltan"""
+        candles = self.klines.get(symbol)
+        if candles is None or len(candles) < limit:
+            fetched = self._call('get_historical_klines', symbol=symbol, interval=interval,
+                                 limit=min(max(limit, len(candles or ())), self.history)) or []
+            merged = {candle['timestamp']: candle for candle in fetched}
+            merged.update((candle['timestamp'], candle) for candle in candles or ())
+            candles = [merged[timestamp] for timestamp in sorted(merged)][-self.history:]
+            self.klines[symbol] = candles
+        return candles[-limit:]
+
+    def get_market_price(self, symbol):
+        price = self.prices.get(symbol)
+        return price if price is not None else self._call('get_market_price', symbol)
+
+def _setup_process_logging(name):
+    # Con fork los handlers se heredan; con spawn hay que configurarlos
+    if not logging.getLogger().handlers:
+        setup_logger(f'logs/{name}.log')
+
+def feed_main(bus_name, symbols, interval, with_ticks, record_path, stop_event):
+    """Proceso de feed: publica velas cerradas y ticks en el bus"""
+    _setup_process_logging('feed')
+    bus = MarketBus(bus_name)
+    # Cada proceso graba en su propio archivo: el log no admite escritores concurrentes
+    recorder = Recorder(f"{record_path}.feed") if record_path else None
+    symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def on_message(message):
+        data = message.get('data', message)
+        symbol_id = symbol_ids.get(data.get('s'))
+        if symbol_id is None:
+            return
+
+        if data.get('e') == 'kline':
+            kline = data['k']
+            if kline['x']:
+                bus.publish(KIND_CANDLE, symbol_id, kline['t'], float(kline['o']), float(kline['h']),
+                            float(kline['l']), float(kline['c']), float(kline['v']))
+            return
+
+        event = parse_tick(message)
+        if event is None:
+            return
+        if event['type'] == 'trade':
+            bus.publish(KIND_TRADE, symbol_id, event['time'], event['price'], event['quantity'],
+                        1.0 if event['buyer_maker'] else 0.0)
+        else:
+            bus.publish(KIND_BOOK, symbol_id, event['time'], event['bid'], event['bid_qty'],
+                        event['ask'], event['ask_qty'])
+
+    streams = (f'kline_{interval}',) + (('aggTrade', 'bookTicker') if with_ticks else ())
+    stream = TickStream(symbols, on_message, recorder=recorder, streams=streams)
+    stream.start()
+    try:
+        while not stop_event.is_set():
+            time.sleep(0.5)
+    finally:
+        stream.stop()
+        bus.close()
+        if recorder:
+            recorder.close()
+
+def gateway_main(request_queue, response_queues, control_queue, symbols, config_data, test_mode,
+                 rate_limit, user_stream, journal_path, record_path, stop_event):
+    """Proceso gateway: único propietario del BinanceClient y de los límites de peticiones"""
+    _setup_process_logging('gateway')
+    from core.exchange import BinanceClient
+    from data.journal import TradeJournal, Checkpointer
+
+    logger = logging.getLogger(__name__)
+    config = Config()
+    config.update(config_data)
+
+    recorder = Recorder(record_path) if record_path else None
+    client = BinanceClient(test_mode=test_mode, recorder=recorder)
+    # Solo consumen tokens las llamadas que llegan al exchange, no las respondidas
+    # desde memoria por el user-data stream
+    client.client = RateLimitedClient(client.client, RateLimiter(rate_limit))
+
+    if config.HEDGE_MODE != client.hedge_mode:
+        if test_mode:
+            # En modo test no se modifica la configuración real de la cuenta
+            logger.warning(f"HEDGE_MODE={config.HEDGE_MODE} no coincide con la cuenta; "
+                           f"se opera en modo {'hedge' if client.hedge_mode else 'one-way'}")
+        else:
+            client.set_position_mode(config.HEDGE_MODE)
+
+    leverage = {}
+    def apply_leverage():
+        if test_mode:
+            return
+        for symbol in symbols:
+            value = config.for_symbol(symbol).LEVERAGE
+            if leverage.get(symbol) != value:
+                client.set_leverage(symbol, value)
+                leverage[symbol] = value
+
+    apply_leverage()
+    if user_stream:
+        client.start_user_stream()
+
+    # Todas las órdenes y ejecuciones pasan por el gateway: el diario vive aquí
+    journal = TradeJournal(journal_path) if journal_path else None
+    checkpointer = None
+    if journal:
+        if client.user_stream:
+            client.user_stream.state.add_listener(journal.on_account_event)
+        # La caché de velas del gateway se conserva entre reinicios como en un solo proceso
+        checkpointer = Checkpointer(journal, interval=config.CHECKPOINT_INTERVAL)
+        checkpointer.register('klines', client.get_kline_state, client.set_kline_state)
+        checkpointer.restore()
+
+    try:
+        while not stop_event.is_set():
+            try:
+                while True:
+                    command = control_queue.get_nowait()
+                    if command[0] == 'config':
+                        config.update(command[1])
+                        apply_leverage()
+                        if checkpointer:
+                            checkpointer.apply_config(config)
+            except queue.Empty:
+                pass
+
+            if checkpointer:
+                checkpointer.maybe_checkpoint()
+
+            try:
+                worker_id, request_id, method, args, kwargs = request_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if method == 'record_signal':
+                # El worker no espera respuesta
+                if journal:
+                    journal.record_signal(*args)
+                continue
+
+            if method == 'hedge_mode':
+                result = client.hedge_mode
+            elif method.startswith('_') or not callable(getattr(client, method, None)):
+                logger.error(f"Método no permitido en el gateway: {method}")
+                result = None
+            else:
+                try:
+                    result = getattr(client, method)(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"Error en el gateway al ejecutar {method}: {e}")
+                    result = None
+                if journal and method == 'place_order':
+                    journal.record_order(
+                        kwargs.get('symbol'), kwargs.get('side'), kwargs.get('quantity'),
+                        kwargs.get('reduce_only', False), kwargs.get('position_side'),
+                        result if isinstance(result, dict) else None, test=test_mode
+                    )
+            response_queues[worker_id].put((request_id, result))
+    finally:
+        client.stop_user_stream()
+        if checkpointer:
+            checkpointer.checkpoint()
+        if journal:
+            journal.close()
+        if recorder:
+            recorder.close()
+
+def worker_main(worker_id, bus_name, symbols, interval, config_data, tasks, control_queue,
+                request_queue, response_queue, report_queue, report_interval, journal_path, stop_event):
+    """Proceso worker: ejecuta su shard de pares (símbolo, estrategia) sobre los datos del bus"""
+    _setup_process_logging(f'worker_{worker_id}')
+    from strategies.factory import create_strategy
+    from data.journal import TradeJournal, Checkpointer
+
+    logger = logging.getLogger(__name__)
+    config = Config()
+    config.update(config_data)
+
+    bus = MarketBus(bus_name)
+    reader = bus.reader()
+    client = GatewayClient(worker_id, request_queue, response_queue)
+
+    # Las señales se registran a través del gateway; el estado de cada tarea se guarda
+    # desde el worker que la ejecuta con los mismos nombres que en un solo proceso
+    journal = TradeJournal(journal_path) if journal_path else None
+    checkpointer = Checkpointer(journal, interval=config.CHECKPOINT_INTERVAL) if journal else None
+
+    engines = {}                      # task_key -> ScalpingEngine
+    candle_tasks = defaultdict(list)  # symbol -> [(task_key, engine)] que operan al cierre de vela
+    tick_tasks = defaultdict(list)    # symbol -> [(task_key, engine)] con on_tick propio
+
+    def add_task(symbol, strategy_name):
+        key = task_key(symbol, strategy_name)
+        if key in engines:
+            return
+        strategy = create_strategy(strategy_name, client, symbol, interval, config)
+        if checkpointer:
+            # Las órdenes ya las registra el gateway: solo las señales pasan por la estrategia
+            strategy.journal = client
+            name = f"strategy:{symbol}:{strategy_name}"
+            checkpointer.register(name, strategy.get_state, strategy.set_state, max_age=strategy.state_max_age())
+            checkpointer.restore([name])
+        symbol_config = config.for_symbol(symbol)
+        engine = ScalpingEngine(
+            strategy,
+            latency_budget_us=symbol_config.SCALP_LATENCY_BUDGET_US,
+            signal_cooldown=symbol_config.SCALP_SIGNAL_COOLDOWN
+        )
+        engines[key] = engine
+        # Las estrategias de ticks operan solo por ScalpingEngine: ejecutarlas también
+        # al cierre de vela repetiría la señal y se saltaría el cooldown
+        if type(strategy).on_tick is not Strategy.on_tick:
+            tick_tasks[symbol].append((key, engine))
+        else:
+            candle_tasks[symbol].append((key, engine))
+        logger.info(f"Worker {worker_id}: tarea {key} añadida")
+
+    def remove_task(key):
+        engine = engines.pop(key, None)
+        if engine is None:
+            return
+        symbol = engine.strategy.symbol
+        if checkpointer:
+            # El worker que recibe la tarea la restaura desde este snapshot
+            checkpointer.unregister(f"strategy:{key}")
+        candle_tasks[symbol] = [item for item in candle_tasks[symbol] if item[0] != key]
+        tick_tasks[symbol] = [item for item in tick_tasks[symbol] if item[0] != key]
+        logger.info(f"Worker {worker_id}: tarea {key} retirada")
+
+    def apply_config(data):
+        # Igual que ConfigWatcher en un solo proceso: cada tarea recibe la configuración de su símbolo
+        config.update(data)
+        for key, engine in engines.items():
+            symbol_config = config.for_symbol(engine.strategy.symbol)
+            try:
+                engine.strategy.apply_config(symbol_config)
+                engine.apply_config(symbol_config)
+            except Exception as error:
+                logger.error(f"Error al aplicar la configuración a {key}: {error}")
+        if checkpointer:
+            checkpointer.apply_config(config)
+
+    for symbol, strategy_name in tasks:
+        add_task(symbol, strategy_name)
+
+    costs = defaultdict(int)  # task_key -> ns de CPU desde el último informe
+    last_report = time.monotonic()
+    process_time = time.process_time_ns
+
+    try:
+        while not stop_event.is_set():
+            try:
+                while True:
+                    command = control_queue.get_nowait()
+                    if command[0] == 'add':
+                        add_task(command[1], command[2])
+                    elif command[0] == 'remove':
+                        remove_task(command[1])
+                        # El destino solo recibe la tarea cuando su último snapshot ya está guardado
+                        report_queue.put(('removed', worker_id, command[1], command[2]))
+                    elif command[0] == 'config':
+                        apply_config(command[1])
+            except queue.Empty:
+                pass
+
+            records = reader.poll()
+            for kind, symbol_id, timestamp, a, b, c, d, e in records:
+                symbol = symbols[symbol_id]
+
+                if kind == KIND_CANDLE:
+                    client.add_candle(symbol, {
+                        'timestamp': timestamp, 'open': a, 'high': b, 'low': c, 'close': d, 'volume': e
+                    })
+                    for key, engine in candle_tasks[symbol]:
+                        start = process_time()
+                        try:
+                            engine.strategy.execute()
+                        except Exception as error:
+                            logger.error(f"Error al ejecutar {key}: {error}")
+                        costs[key] += process_time() - start
+                    continue
+
+                if kind == KIND_TRADE:
+                    client.prices[symbol] = a
+                    event = {'type': 'trade', 'symbol': symbol, 'price': a, 'quantity': b,
+                             'time': timestamp, 'buyer_maker': c > 0}
+                else:
+                    event = {'type': 'book', 'symbol': symbol, 'bid': a, 'bid_qty': b,
+                             'ask': c, 'ask_qty': d, 'time': timestamp}
+
+                for key, engine in tick_tasks[symbol]:
+                    start = process_time()
+                    try:
+                        engine.on_event(event)
+                    except Exception as error:
+                        logger.error(f"Error al procesar tick en {key}: {error}")
+                    costs[key] += process_time() - start
+
+            now = time.monotonic()
+            if now - last_report >= report_interval:
+                # Coste en ms de CPU por segundo de cada tarea
+                elapsed = now - last_report
+                loads = {key: costs.get(key, 0) / 1e6 / elapsed for key in engines}
+                report_queue.put(('load', worker_id, loads, reader.lapped))
+                costs.clear()
+                last_report = now
+
+            if checkpointer:
+                checkpointer.maybe_checkpoint()
+
+            if not records:
+                time.sleep(0.001)
+    finally:
+        if checkpointer:
+            checkpointer.checkpoint()
+            journal.close()
+        bus.close()
+
+class ShardedRuntime:
+    """Ejecuta pares (símbolo, estrategia) en varios procesos alimentados por un bus compartido"""
+
+    def __init__(self, symbols, strategies, interval, config, workers=None, test_mode=False,
+                 rate_limit=20, user_stream=True, journal_path=None, record_path=None, watcher=None,
+                 bus_capacity=65536, report_interval=10, rebalance_interval=60):
+        """
+        Inicializa el runtime
+
+        Args:
+            symbols: Símbolos a operar
+            strategies: Nombres de estrategias a ejecutar en cada símbolo
+            interval: Intervalo de velas
+            config: Config global
+            workers: Procesos worker (núcleos disponibles menos feed y gateway por defecto)
+            test_mode: Si es True las órdenes solo se registran en el log
+            rate_limit: Peticiones por segundo permitidas al gateway
+            user_stream: Si el gateway usa el user-data stream
+            journal_path: Diario de señales, órdenes, ejecuciones y snapshots de estado (None para desactivarlo)
+            record_path: Grabación de las respuestas del gateway; el feed graba en record_path + '.feed'
+            watcher: ConfigWatcher opcional cuyas recargas se envían a gateway y workers
+            bus_capacity: Registros del buffer compartido
+            report_interval: Segundos entre informes de carga de los workers
+            rebalance_interval: Segundos entre reequilibrados del reparto
+        """
+        self.symbols = list(symbols)
+        self.tasks = [(symbol, strategy) for symbol in self.symbols for strategy in strategies]
+        self.interval = interval
+        self.config = config
+        self.workers = workers or max(1, (os.cpu_count() or 3) - 2)
+        self.test_mode = test_mode
+        self.rate_limit = rate_limit
+        self.user_stream = user_stream
+        self.journal_path = journal_path
+        self.record_path = record_path
+        self.watcher = watcher
+        self.bus_capacity = bus_capacity
+        self.report_interval = report_interval
+        self.rebalance_interval = rebalance_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.costs = {}
+        self.moving = {}  # task_key -> tarea pendiente de confirmación del worker origen
+        self.assignment = []
+        self.processes = []
+        self.bus = None
+
+    def start(self):
+        """Crea el bus y arranca feed, gateway y workers"""
+        context = multiprocessing.get_context()
+        self.stop_event = context.Event()
+        self.report_queue = context.Queue()
+        self.request_queue = context.Queue()
+        self.response_queues = [context.Queue() for _ in range(self.workers)]
+        self.control_queues = [context.Queue() for _ in range(self.workers)]
+        self.gateway_queue = context.Queue()
+
+        self.bus = MarketBus(capacity=self.bus_capacity, create=True)
+        self.assignment = assign_shards(self.tasks, self.workers)
+        with_ticks = any(strategy == 'scalp' for _, strategy in self.tasks)
+
+        self.processes.append(context.Process(
+            target=gateway_main, name='gateway',
+            args=(self.request_queue, self.response_queues, self.gateway_queue, self.symbols,
+                  self.config.to_dict(), self.test_mode, self.rate_limit, self.user_stream,
+                  self.journal_path, self.record_path, self.stop_event)
+        ))
+        for worker_id in range(self.workers):
+            self.processes.append(context.Process(
+                target=worker_main, name=f'worker-{worker_id}',
+                args=(worker_id, self.bus.name, self.symbols, self.interval, self.config.to_dict(),
+                      self.assignment[worker_id], self.control_queues[worker_id], self.request_queue,
+                      self.response_queues[worker_id], self.report_queue, self.report_interval,
+                      self.journal_path, self.stop_event)
+            ))
+        self.processes.append(context.Process(
+            target=feed_main, name='feed',
+            args=(self.bus.name, self.symbols, self.interval, with_ticks, self.record_path, self.stop_event)
+        ))
+
+        for process in self.processes:
+            process.start()
+
+        for worker_id, shard in enumerate(self.assignment):
+            self.logger.info(f"Worker {worker_id}: {', '.join(task_key(*task) for task in shard) or 'sin tareas'}")
+
+    def run(self):
+        """Arranca el runtime y reequilibra la carga hasta que se detenga"""
+        self.start()
+        last_rebalance = time.monotonic()
+        try:
+            while True:
+                try:
+                    report = self.report_queue.get(timeout=1)
+                    if report[0] == 'removed':
+                        self.complete_move(*report[1:])
+                    else:
+                        _, worker_id, loads, lapped = report
+                        # Media exponencial para no reaccionar a picos aislados
+                        for key, load in loads.items():
+                            previous = self.costs.get(key)
+                            self.costs[key] = load if previous is None else 0.7 * previous + 0.3 * load
+                        if lapped:
+                            self.logger.warning(f"Worker {worker_id} ha perdido {lapped} registros del bus")
+                except queue.Empty:
+                    pass
+
+                if self.watcher and self.watcher.poll():
+                    self.broadcast_config()
+
+                for process in self.processes:
+                    if not process.is_alive():
+                        raise RuntimeError(f"El proceso {process.name} terminó inesperadamente")
+
+                if not self.moving and time.monotonic() - last_rebalance >= self.rebalance_interval:
+                    self.rebalance()
+                    last_rebalance = time.monotonic()
+        finally:
+            self.stop()
+
+    def broadcast_config(self):
+        """Envía la configuración actual al gateway y a todos los workers"""
+        config_data = self.config.to_dict()
+        self.gateway_queue.put(('config', config_data))
+        for control_queue in self.control_queues:
+            control_queue.put(('config', config_data))
+
+    def rebalance(self):
+        """
+        Mueve tareas del worker más cargado al menos cargado según el coste medido
+
+        La tarea se retira primero del worker origen; el destino la recibe en
+        complete_move, cuando el origen confirma que guardó su último snapshot.
+        """
+        for task, source, target in plan_rebalance(self.assignment, self.costs):
+            key = task_key(*task)
+            self.moving[key] = task
+            self.control_queues[source].put(('remove', key, target))
+            self.assignment[source].remove(task)
+            self.assignment[target].append(task)
+            self.logger.info(f"Tarea {key} retirada del worker {source} para moverla al {target}")
+
+    def complete_move(self, source, key, target):
+        """Entrega al worker destino una tarea que el origen ya retiró"""
+        task = self.moving.pop(key, None)
+        if task is None:
+            return
+        self.control_queues[target].put(('add', task[0], task[1]))
+        self.logger.info(f"Tarea {key} movida del worker {source} al {target}")
+
+    def stop(self):
+        """Detiene todos los procesos y libera el bus"""
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        if self.bus:
+            self.bus.close()
+            self.bus = None
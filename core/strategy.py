@@ -2,6 +2,7 @@
 
 import logging
 from abc import ABC, abstractmethod
+from core.order_router import OrderRouter, net_exposure
 
 class Strategy(ABC):
     """Clase base abstracta para todas las estrategias de trading"""
@@ -10,6 +11,8 @@ class Strategy(ABC):
         self.client = client
         self.symbol = symbol
         self.interval = interval
+        self.router = OrderRouter(client)
+        self.journal = None
         self.logger = logging.getLogger(__name__)
     
     @abstractmethod
@@ -27,6 +30,36 @@ class Strategy(ABC):
         """
         pass
     
+    def attach_journal(self, journal):
+        """Registra señales y órdenes de la estrategia en un TradeJournal"""
+        self.journal = journal
+        self.router.journal = journal
+    
+    def get_state(self):
+        """Estado en memoria a conservar entre reinicios (serializable a JSON)"""
+        return {}
+    
+    def set_state(self, state):
+        """Restaura el estado devuelto por get_state"""
+        pass
+    
+    def state_max_age(self):
+        """Segundos tras los que el estado guardado ya no es válido (None: sin límite)"""
+        return None
+    
+    def apply_config(self, config):
+        """Aplica en caliente una configuración recargada sin perder el estado de la estrategia"""
+        risk_manager = getattr(self, 'risk_manager', None)
+        if risk_manager:
+            risk_manager.apply_config(config)
+    
+    def on_tick(self, event):
+        """
+        Evalúa un evento de tick (trade o libro) en el modo scalping
+        Debe devolver: 'BUY', 'SELL' o None
+        """
+        return None
+    
     def execute(self):
         """Ejecuta la estrategia: analiza el mercado y opera si hay señal"""
         signal = self.analyze()
@@ -35,53 +68,35 @@ class Strategy(ABC):
             self.logger.info(f"No hay señal para {self.symbol}")
             return
         
-        # Obtener posición actual
-        position = self.client.get_position(self.symbol)
-        position_amount = position['amount'] if position else 0
+        self.execute_signal(signal)
+    
+    def execute_signal(self, signal):
+        """Opera según la señal y la posición actual"""
+        if self.journal:
+            self.journal.record_signal(self.symbol, type(self).__name__, signal)
+        
+        # Obtener patas actuales y exposición neta
+        positions = self.client.get_positions(self.symbol)
+        if positions is None:
+            # El gateway no respondió: sin posiciones fiables no se opera
+            self.logger.warning(f"Posiciones de {self.symbol} no disponibles, señal {signal} descartada")
+            return
+        position_amount = net_exposure(positions)
         
-        # Determinar acción basada en la señal y posición actual
+        # Determinar exposición objetivo basada en la señal y posición actual
         if signal == 'BUY' and position_amount <= 0:
             # Si la señal es comprar y no tenemos posición larga
-            quantity = self.calculate_position_size(signal)
-            
-            # Si tenemos posición corta, primero cerrarla
-            if position_amount < 0:
-                self.client.place_order(
-                    symbol=self.symbol,
-                    side='BUY',
-                    quantity=abs(position_amount),
-                    reduce_only=True
-                )
-                self.logger.info(f"Posición corta cerrada para {self.symbol}")
-            
-            # Abrir posición larga
-            if quantity > 0:
-                self.client.place_order(
-                    symbol=self.symbol,
-                    side='BUY',
-                    quantity=quantity
-                )
-                self.logger.info(f"Posición larga abierta: {quantity} {self.symbol}")
-                
+            target = self.calculate_position_size(signal)
         elif signal == 'SELL' and position_amount >= 0:
             # Si la señal es vender y no tenemos posición corta
-            quantity = self.calculate_position_size(signal)
-            
-            # Si tenemos posición larga, primero cerrarla
-            if position_amount > 0:
-                self.client.place_order(
-                    symbol=self.symbol,
-                    side='SELL',
-                    quantity=position_amount,
-                    reduce_only=True
-                )
-                self.logger.info(f"Posición larga cerrada para {self.symbol}")
-            
-            # Abrir posición corta
-            if quantity > 0:
-                self.client.place_order(
-                    symbol=self.symbol,
-                    side='SELL',
-                    quantity=quantity
-                )
-                self.logger.info(f"Posición corta abierta: {quantity} {self.symbol}") 
\ No newline at end of file
+            target = -self.calculate_position_size(signal)
+        else:
+            return
+        
+        if not target:
+            # Sin balance o precio el objetivo sería cerrar la posición, no seguir la señal
+            self.logger.warning(f"Tamaño de posición no disponible para {self.symbol}, señal {signal} descartada")
+            return
+        
+        # El router reduce la pata contraria y abre solo el remanente
+        self.router.route(self.symbol, target, positions)
\ No newline at end of file
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import logging
+import threading
+import websocket
+from utils.ring_buffer import RingBuffer
+
+def parse_tick(message):
+    """
+    Normaliza un mensaje aggTrade o bookTicker de Binance Futures
+
+    Args:
+        message: Mensaje decodificado (directo o envuelto por un stream combinado)
+
+    Returns:
+        dict: Evento normalizado o None si el tipo no es soportado
+    """
+    data = message.get('data', message)
+    event_type = data.get('e')
+
+    if event_type == 'aggTrade':
+        return {
+            'type': 'trade',
+            'symbol': data['s'],
+            'price': float(data['p']),
+            'quantity': float(data['q']),
+            'time': data['T'],
+            'buyer_maker': data['m']
+        }
+    if event_type == 'bookTicker':
+        return {
+            'type': 'book',
+            'symbol': data['s'],
+            'bid': float(data['b']),
+            'bid_qty': float(data['B']),
+            'ask': float(data['a']),
+            'ask_qty': float(data['A']),
+            'time': data.get('T', data.get('E', 0))
+        }
+    return None
+
+class MicroBarAggregator:
+    """Agrega trades en micro-barras de duración fija almacenadas en buffers circulares"""
+
+    __slots__ = ('bar_ms', 'timestamps', 'opens', 'highs', 'lows', 'closes', 'volumes', '_bar_start')
+
+    def __init__(self, bar_ms=1000, capacity=500):
+        """
+        Inicializa el agregador
+
+        Args:
+            bar_ms: Duración de cada micro-barra en milisegundos
+            capacity: Número de micro-barras a conservar
+        """
+        self.bar_ms = bar_ms
+        self.timestamps = RingBuffer(capacity, 0)
+        self.opens = RingBuffer(capacity)
+        self.highs = RingBuffer(capacity)
+        self.lows = RingBuffer(capacity)
+        self.closes = RingBuffer(capacity)
+        self.volumes = RingBuffer(capacity)
+        self._bar_start = None
+
+    def update(self, price, quantity, timestamp):
+        """
+        Añade un trade a la micro-barra en curso
+
+        Args:
+            price: Precio del trade
+            quantity: Cantidad negociada
+            timestamp: Tiempo del trade en milisegundos
+
+        Returns:
+            bool: True si el trade abrió una nueva micro-barra (la anterior quedó cerrada)
+        """
+        bar_start = timestamp - timestamp % self.bar_ms
+
+        if bar_start != self._bar_start:
+            closed = self._bar_start is not None
+            self._bar_start = bar_start
+            self.timestamps.append(bar_start)
+            self.opens.append(price)
+            self.highs.append(price)
+            self.lows.append(price)
+            self.closes.append(price)
+            self.volumes.append(quantity)
+            return closed
+
+        if price > self.highs[-1]:
+            self.highs.replace_last(price)
+        elif price < self.lows[-1]:
+            self.lows.replace_last(price)
+        self.closes.replace_last(price)
+        self.volumes.replace_last(self.volumes[-1] + quantity)
+        return False
+
+    def __len__(self):
+        return len(self.closes)
+
+class ScalpingEngine:
+    """Despacha eventos de ticks a una estrategia midiendo la latencia de cada decisión"""
+
+    def __init__(self, strategy, latency_budget_us=300, signal_cooldown=5, dry_run=False):
+        """
+        Inicializa el motor de scalping
+
+        Args:
+            strategy: Estrategia que implementa on_tick
+            latency_budget_us: Presupuesto de latencia por evento en microsegundos
+            signal_cooldown: Segundos mínimos entre órdenes enviadas
+            dry_run: Si es True las señales se cuentan pero no se ejecutan
+        """
+        self.strategy = strategy
+        self.latency_budget_ns = int(latency_budget_us * 1000)
+        self.signal_cooldown = signal_cooldown
+        self.dry_run = dry_run
+        self.logger = logging.getLogger(__name__)
+
+        self.events = 0
+        self.signals = 0
+        self.over_budget = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._last_signal_time = 0
+
+    def apply_config(self, config):
+        """Actualiza el presupuesto de latencia y el cooldown en caliente"""
+        self.latency_budget_ns = int(config.SCALP_LATENCY_BUDGET_US * 1000)
+        self.signal_cooldown = config.SCALP_SIGNAL_COOLDOWN
+
+    def on_event(self, event):
+        """
+        Procesa un evento normalizado
+
+        Args:
+            event: Evento devuelto por parse_tick
+
+        Returns:
+            str: Señal generada ('BUY', 'SELL' o None)
+        """
+        start = time.perf_counter_ns()
+        signal = self.strategy.on_tick(event)
+        elapsed = time.perf_counter_ns() - start
+
+        self.events += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        if elapsed > self.latency_budget_ns:
+            self.over_budget += 1
+
+        if signal:
+            self.signals += 1
+            if not self.dry_run:
+                now = time.monotonic()
+                if now - self._last_signal_time >= self.signal_cooldown:
+                    self._last_signal_time = now
+                    self.strategy.execute_signal(signal)
+
+        return signal
+
+    def on_message(self, message):
+        """Normaliza y procesa un mensaje crudo del stream"""
+        event = parse_tick(message)
+        if event is not None:
+            return self.on_event(event)
+        return None
+
+    def stats(self):
+        """
+        Devuelve las estadísticas de latencia acumuladas
+
+        Returns:
+            dict: Eventos, señales y latencias en microsegundos
+        """
+        return {
+            'events': self.events,
+            'signals': self.signals,
+            'over_budget': self.over_budget,
+            'avg_latency_us': (self.total_ns / self.events / 1000) if self.events else 0.0,
+            'max_latency_us': self.max_ns / 1000
+        }
+
+class TickStream:
+    """Consume los streams aggTrade y bookTicker de Binance Futures"""
+
+    STREAM_URL = 'wss://fstream.binance.com/stream?streams='
+
+    def __init__(self, symbols, handler, max_reconnect_delay=60, stream_url=None, recorder=None,
+                 streams=('aggTrade', 'bookTicker')):
+        """
+        Inicializa el consumidor de ticks
+
+        Args:
+            symbols: Lista de símbolos a suscribir
+            handler: Función que recibe cada mensaje decodificado
+            max_reconnect_delay: Espera máxima en segundos entre reconexiones
+            stream_url: URL base del stream combinado
+            recorder: Recorder opcional que graba cada mensaje recibido
+            streams: Streams a suscribir por símbolo (p. ej. 'kline_1m')
+        """
+        self.symbols = symbols
+        self.streams = streams
+        self.recorder = recorder
+        self.handler = handler
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stream_url = stream_url or self.STREAM_URL
+        self.logger = logging.getLogger(__name__)
+        self._ws = None
+        self._running = False
+        self._thread = None
+
+    def start(self, block=False):
+        """Arranca el stream, en segundo plano salvo que block sea True"""
+        self._running = True
+        if block:
+            self._run()
+        else:
+            self._thread = threading.Thread(target=self._run, name='tick-stream', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detiene el stream"""
+        self._running = False
+        if self._ws:
+            self._ws.close()
+
+    def _run(self):
+        """Bucle de conexión con reconexión exponencial"""
+        streams = '/'.join(f"{s.lower()}@{stream}" for s in self.symbols for stream in self.streams)
+        delay = 1
+        while self._running:
+            try:
+                self._ws = websocket.WebSocketApp(
+                    self.stream_url + streams,
+                    on_message=self._on_message,
+                    on_error=self._on_error
+                )
+                self._ws.run_forever(ping_interval=60, ping_timeout=10)
+                delay = 1
+            except Exception as e:
+                self.logger.error(f"Error en el stream de ticks: {e}")
+
+            if self._running:
+                self.logger.warning(f"Stream de ticks desconectado, reconectando en {delay}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_message(self, ws, message):
+        try:
+            if self.recorder:
+                self.recorder.record_stream('ticks', message)
+            self.handler(json.loads(message))
+        except Exception as e:
+            self.logger.error(f"Error al procesar tick: {e}")
+
+    def _on_error(self, ws, error):
+        self.logger.error(f"Error en el websocket de ticks: {error}")
+
+def load_ticks(path):
+    """
+    Carga un archivo de ticks grabados (un mensaje JSON por línea) ya normalizados
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        list: Eventos normalizados
+    """
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = parse_tick(json.loads(line))
+            if event is not None:
+                events.append(event)
+    return events
+
+def replay_ticks(path, engine):
+    """
+    Reproduce un archivo de ticks a máxima velocidad sobre un ScalpingEngine
+
+    El archivo se decodifica antes de medir para que el resultado refleje
+    únicamente el coste de la estrategia.
+
+    Args:
+        path: Ruta del archivo de ticks grabados
+        engine: ScalpingEngine a alimentar
+
+    Returns:
+        dict: Estadísticas del motor más eventos por segundo
+    """
+    events = load_ticks(path)
+
+    start = time.perf_counter()
+    on_event = engine.on_event
+    for event in events:
+        on_event(event)
+    elapsed = time.perf_counter() - start
+
+    stats = engine.stats()
+    stats['elapsed_s'] = elapsed
+    stats['events_per_second'] = len(events) / elapsed if elapsed > 0 else 0.0
+    return stats
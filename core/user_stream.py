@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import logging
+import threading
+import websocket
+
+class AccountState:
+    """Modelo local de balances, posiciones y órdenes alimentado por el user-data stream"""
+
+    def __init__(self):
+        self.balances = {}   # asset -> dict con balances
+        self.positions = {}  # (symbol, position_side) -> dict con la posición
+        self.orders = {}     # order_id -> dict con la orden abierta
+        self.leverages = {}  # symbol -> apalancamiento
+        self.last_event_time = 0
+        # El stream no informa el balance disponible: tras cualquier cambio de
+        # balances o posiciones se desconoce hasta el siguiente snapshot REST
+        self.available_stale = False
+        self.listeners = []
+        self._resync_buffer = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def add_listener(self, callback):
+        """Registra una función que recibe (event_type, datos) tras aplicar cada evento"""
+        self.listeners.append(callback)
+
+    def begin_resync(self):
+        """
+        Empieza a guardar los eventos aplicados mientras se descarga un snapshot
+
+        load_snapshot vuelve a aplicar esos eventos sobre el snapshot para no
+        perder los que llegaron después de la consulta REST.
+        """
+        with self._lock:
+            self._resync_buffer = []
+
+    def cancel_resync(self):
+        """Deja de guardar eventos si la descarga del snapshot falló"""
+        with self._lock:
+            self._resync_buffer = None
+
+    def load_snapshot(self, account, positions, open_orders=None):
+        """
+        Reemplaza el estado local con un snapshot obtenido por REST
+
+        Los eventos recibidos desde begin_resync se aplican de nuevo sobre el
+        snapshot; los que ya estaban reflejados se descartan por su timestamp.
+
+        Args:
+            account: Respuesta de futures_account
+            positions: Respuesta de futures_position_information
+            open_orders: Respuesta opcional de futures_get_open_orders
+        """
+        balances = {}
+        for balance in account.get('assets', []):
+            balances[balance['asset']] = {
+                'wallet_balance': float(balance['walletBalance']),
+                'cross_wallet_balance': float(balance.get('crossWalletBalance', balance['walletBalance'])),
+                'available_balance': float(balance['availableBalance']),
+                'update_time': int(balance.get('updateTime', 0))
+            }
+
+        leverages = {}
+        new_positions = {}
+        for position in positions:
+            symbol = position['symbol']
+            position_side = position.get('positionSide', 'BOTH')
+            leverages[symbol] = int(position['leverage'])
+            new_positions[(symbol, position_side)] = {
+                'symbol': symbol,
+                'position_side': position_side,
+                'amount': float(position['positionAmt']),
+                'entry_price': float(position['entryPrice']),
+                'unrealized_pnl': float(position['unRealizedProfit']),
+                'update_time': int(position.get('updateTime', 0))
+            }
+
+        orders = {}
+        for order in open_orders or []:
+            orders[order['orderId']] = {
+                'order_id': order['orderId'],
+                'client_order_id': order.get('clientOrderId'),
+                'symbol': order['symbol'],
+                'side': order['side'],
+                'position_side': order.get('positionSide', 'BOTH'),
+                'type': order['type'],
+                'status': order['status'],
+                'execution_type': None,
+                'quantity': float(order['origQty']),
+                'price': float(order['price']),
+                'filled_quantity': float(order['executedQty']),
+                'last_filled_quantity': 0.0,
+                'last_filled_price': 0.0,
+                'realized_pnl': 0.0,
+                'commission': 0.0,
+                'reduce_only': order.get('reduceOnly', False),
+                'trade_time': int(order.get('updateTime', 0))
+            }
+
+        with self._lock:
+            self.balances = balances
+            self.positions = new_positions
+            self.leverages = leverages
+            self.orders = orders
+            self.available_stale = False
+
+            buffered, self._resync_buffer = self._resync_buffer, None
+            for event in buffered or ():
+                self._apply(event)
+
+    def apply_event(self, event):
+        """
+        Aplica un evento del user-data stream al estado local
+
+        Args:
+            event: Mensaje del stream ya decodificado
+
+        Returns:
+            str: Tipo de evento aplicado
+        """
+        event_type = event.get('e')
+
+        with self._lock:
+            if self._resync_buffer is not None:
+                self._resync_buffer.append(event)
+            payload = self._apply(event)
+
+        if self.listeners and payload is not None:
+            for callback in self.listeners:
+                try:
+                    callback(event_type, payload)
+                except Exception as e:
+                    self.logger.error(f"Error en listener del user-data stream: {e}")
+
+        return event_type
+
+    def _apply(self, event):
+        """Aplica un evento con el lock tomado y devuelve los datos para los listeners"""
+        event_type = event.get('e')
+        event_time = int(event.get('E', 0))
+        payload = None
+
+        if event_type == 'ACCOUNT_UPDATE':
+            self._apply_account_update(event['a'], event_time)
+            payload = event['a']
+        elif event_type == 'ORDER_TRADE_UPDATE':
+            payload = self._apply_order_update(event['o'])
+        elif event_type == 'ACCOUNT_CONFIG_UPDATE':
+            if 'ac' in event:
+                self.leverages[event['ac']['s']] = int(event['ac']['l'])
+
+        if event_time > self.last_event_time:
+            self.last_event_time = event_time
+        return payload
+
+    def _apply_account_update(self, update, event_time):
+        """Actualiza balances y posiciones desde un ACCOUNT_UPDATE"""
+        for balance in update.get('B', []):
+            asset = balance['a']
+            current = self.balances.get(asset)
+            if current and event_time <= current['update_time']:
+                continue
+
+            self.balances[asset] = {
+                'wallet_balance': float(balance['wb']),
+                'cross_wallet_balance': float(balance['cw']),
+                'available_balance': current['available_balance'] if current else float(balance['cw']),
+                'update_time': event_time
+            }
+            self.available_stale = True
+
+        for position in update.get('P', []):
+            key = (position['s'], position.get('ps', 'BOTH'))
+            current = self.positions.get(key)
+            if current and event_time <= current['update_time']:
+                continue
+
+            self.positions[key] = {
+                'symbol': position['s'],
+                'position_side': key[1],
+                'amount': float(position['pa']),
+                'entry_price': float(position['ep']),
+                'unrealized_pnl': float(position['up']),
+                'update_time': event_time
+            }
+            # El margen de la posición cambió el balance disponible
+            self.available_stale = True
+
+    def _apply_order_update(self, order):
+        """Actualiza las órdenes abiertas desde un ORDER_TRADE_UPDATE"""
+        data = {
+            'order_id': order['i'],
+            'client_order_id': order.get('c'),
+            'symbol': order['s'],
+            'side': order['S'],
+            'position_side': order.get('ps', 'BOTH'),
+            'type': order['o'],
+            'status': order['X'],
+            'execution_type': order.get('x'),
+            'quantity': float(order['q']),
+            'price': float(order['p']),
+            'filled_quantity': float(order['z']),
+            'last_filled_quantity': float(order.get('l', 0)),
+            'last_filled_price': float(order.get('L', 0)),
+            'realized_pnl': float(order.get('rp', 0)),
+            'commission': float(order.get('n', 0)),
+            'reduce_only': order.get('R', False),
+            'trade_time': int(order.get('T', 0))
+        }
+
+        if data['status'] in ('NEW', 'PARTIALLY_FILLED'):
+            self.orders[data['order_id']] = data
+        else:
+            self.orders.pop(data['order_id'], None)
+
+        return data
+
+    def get_available_balance(self, asset='USDT'):
+        """Devuelve el balance disponible de un activo o None si no se conoce o está desactualizado"""
+        balance = self.balances.get(asset)
+        if not balance or self.available_stale:
+            return None
+        return balance['available_balance']
+
+    def get_position(self, symbol, position_side='BOTH'):
+        """Devuelve la posición con el mismo formato que BinanceClient.get_position"""
+        position = self.positions.get((symbol, position_side))
+        if not position:
+            return None
+        return {
+            'symbol': position['symbol'],
+            'amount': position['amount'],
+            'entry_price': position['entry_price'],
+            'unrealized_pnl': position['unrealized_pnl'],
+            'leverage': self.leverages.get(symbol, 0)
+        }
+
+    def get_positions(self, symbol):
+        """Devuelve las patas de un símbolo indexadas por position_side"""
+        return {
+            position_side: self.get_position(symbol, position_side)
+            for (position_symbol, position_side) in list(self.positions)
+            if position_symbol == symbol
+        }
+
+    def get_open_orders(self, symbol=None):
+        """Devuelve las órdenes abiertas, opcionalmente filtradas por símbolo"""
+        return [order for order in self.orders.values() if symbol is None or order['symbol'] == symbol]
+
+class UserDataStream:
+    """Consume el user-data stream de Binance Futures y mantiene un AccountState"""
+
+    STREAM_URL = 'wss://fstream.binance.com/ws/'
+
+    def __init__(self, client, state=None, keepalive_interval=30 * 60, resync_interval=15 * 60,
+                 stale_resync_interval=5, max_reconnect_delay=60, stream_url=None, recorder=None):
+        """
+        Inicializa el consumidor del user-data stream
+
+        Args:
+            client: Cliente de python-binance
+            state: AccountState a alimentar (se crea uno si no se indica)
+            keepalive_interval: Segundos entre renovaciones del listen key
+            resync_interval: Segundos entre resincronizaciones con snapshot REST
+            stale_resync_interval: Segundos mínimos entre resincronizaciones cuando el balance
+                disponible está desactualizado tras una ejecución
+            max_reconnect_delay: Espera máxima en segundos entre reconexiones
+            stream_url: URL base del stream
+            recorder: Recorder opcional que graba cada mensaje recibido
+        """
+        self.client = client
+        self.recorder = recorder
+        self.state = state or AccountState()
+        self.keepalive_interval = keepalive_interval
+        self.resync_interval = resync_interval
+        self.stale_resync_interval = stale_resync_interval
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stream_url = stream_url or self.STREAM_URL
+        self.logger = logging.getLogger(__name__)
+
+        self.listen_key = None
+        self.synced = False
+        self._ws = None
+        self._running = False
+        self._threads = []
+        self._last_keepalive = 0
+        self._last_resync = 0
+
+    def start(self):
+        """Arranca el stream y el mantenimiento del listen key en segundo plano"""
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._run, name='user-stream', daemon=True),
+            threading.Thread(target=self._maintain, name='user-stream-keepalive', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Detiene el stream"""
+        self._running = False
+        self.synced = False
+        if self._ws:
+            self._ws.close()
+
+    def resync(self):
+        """Carga un snapshot REST de balances, posiciones y órdenes abiertas"""
+        # Los eventos que lleguen durante la consulta se reaplican sobre el snapshot
+        self.state.begin_resync()
+        try:
+            account = self.client.futures_account()
+            positions = self.client.futures_position_information()
+            open_orders = self.client.futures_get_open_orders()
+        except Exception:
+            self.state.cancel_resync()
+            raise
+        self.state.load_snapshot(account, positions, open_orders)
+        self._last_resync = time.monotonic()
+        self.logger.info("Estado de la cuenta sincronizado con snapshot REST")
+
+    def _run(self):
+        """Bucle de conexión con reconexión exponencial"""
+        delay = 1
+        while self._running:
+            try:
+                self.listen_key = self.client.futures_stream_get_listen_key()
+                self._last_keepalive = time.monotonic()
+
+                self._ws = websocket.WebSocketApp(
+                    self.stream_url + self.listen_key,
+                    on_open=self._on_open,
+                    on_message=self._on_message,
+                    on_error=self._on_error,
+                    on_close=self._on_close
+                )
+                self._ws.run_forever(ping_interval=60, ping_timeout=10)
+                delay = 1
+            except Exception as e:
+                self.logger.error(f"Error en el user-data stream: {e}")
+
+            self.synced = False
+            if self._running:
+                self.logger.warning(f"User-data stream desconectado, reconectando en {delay}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _maintain(self):
+        """Renueva el listen key y resincroniza el estado periódicamente"""
+        while self._running:
+            time.sleep(1)
+            now = time.monotonic()
+            try:
+                if self.listen_key and now - self._last_keepalive >= self.keepalive_interval:
+                    self.client.futures_stream_keepalive(listenKey=self.listen_key)
+                    self._last_keepalive = now
+                    self.logger.info("Listen key renovado")
+
+                since_resync = now - self._last_resync
+                if self.synced and (since_resync >= self.resync_interval or
+                                    (self.state.available_stale and since_resync >= self.stale_resync_interval)):
+                    self.resync()
+            except Exception as e:
+                self.logger.error(f"Error en el mantenimiento del user-data stream: {e}")
+
+    def _on_open(self, ws):
+        # Los eventos anteriores al snapshot se descartan por su timestamp
+        try:
+            self.resync()
+            self.synced = True
+            self.logger.info("User-data stream conectado")
+        except Exception as e:
+            self.logger.error(f"Error al sincronizar el estado de la cuenta: {e}")
+            ws.close()
+
+    def handle_message(self, message):
+        """
+        Procesa un mensaje crudo del stream
+
+        Args:
+            message: Texto JSON recibido del websocket
+
+        Returns:
+            bool: False si el listen key expiró y hay que reconectar
+        """
+        if self.recorder:
+            self.recorder.record_stream('user', message)
+
+        event = json.loads(message)
+        if event.get('e') == 'listenKeyExpired':
+            return False
+        self.state.apply_event(event)
+        return True
+
+    def _on_message(self, ws, message):
+        try:
+            if not self.handle_message(message):
+                self.logger.warning("Listen key expirado, reconectando")
+                ws.close()
+        except Exception as e:
+            self.logger.error(f"Error al procesar evento del user-data stream: {e}")
+
+    def _on_error(self, ws, error):
+        self.logger.error(f"Error en el websocket del user-data stream: {error}")
+
+    def _on_close(self, ws, status_code, message):
+        self.synced = False
+
+def replay_events(path, state=None):
+    """
+    Reproduce un archivo de eventos grabados (un JSON por línea) sobre un AccountState
+
+    Las líneas con la clave 'snapshot' deben contener 'account' y 'positions'
+    y se cargan como snapshot REST.
+
+    Args:
+        path: Ruta del archivo de eventos
+        state: AccountState a alimentar (se crea uno si no se indica)
+
+    Returns:
+        AccountState: Estado resultante
+    """
+    state = state or AccountState()
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'snapshot' in record:
+                snapshot = record['snapshot']
+                state.load_snapshot(snapshot['account'], snapshot['positions'], snapshot.get('open_orders'))
+            else:
+                state.apply_event(record)
+    return state
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    signal TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    position_side TEXT,
+    quantity REAL NOT NULL,
+    reduce_only INTEGER NOT NULL,
+    order_id TEXT,
+    status TEXT,
+    test INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    side TEXT NOT NULL,
+    position_side TEXT,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    commission REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS balances (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    asset TEXT NOT NULL,
+    wallet_balance REAL NOT NULL,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals (symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_ts ON orders (symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_ts ON fills (symbol, ts);
+"""
+
+INSERTS = {
+    'signals': "INSERT INTO signals (ts, symbol, strategy, signal) VALUES (?, ?, ?, ?)",
+    'orders': "INSERT INTO orders (ts, symbol, side, position_side, quantity, reduce_only, order_id, status, test) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'fills': "INSERT INTO fills (ts, symbol, order_id, side, position_side, quantity, price, realized_pnl, commission) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'balances': "INSERT INTO balances (ts, asset, wallet_balance, reason) VALUES (?, ?, ?, ?)",
+}
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+class TradeJournal:
+    """Diario persistente de señales, órdenes, ejecuciones y balances sobre SQLite en modo WAL"""
+
+    def __init__(self, path='data/journal.db', batch_size=100, flush_interval=1.0):
+        """
+        Abre (o crea) el diario
+
+        Args:
+            path: Ruta de la base de datos
+            batch_size: Registros pendientes que fuerzan una escritura
+            flush_interval: Segundos máximos que un registro permanece en memoria
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+
+        # Los eventos de ejecuciones llegan desde el hilo del user-data stream
+        self._lock = threading.Lock()
+        self._pending = {table: [] for table in INSERTS}
+        self._pending_count = 0
+        self._closed = threading.Event()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL con synchronous=NORMAL: un fsync por checkpoint en lugar de por transacción
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        # El volcado periódico no depende de que lleguen más registros
+        self._flusher = threading.Thread(target=self._flush_loop, name='journal-flush', daemon=True)
+        self._flusher.start()
+
+    def _append(self, table, row):
+        with self._lock:
+            self._pending[table].append(row)
+            self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _flush_locked(self):
+        if not self._pending_count:
+            return
+        try:
+            with self.conn:
+                for table, rows in self._pending.items():
+                    if rows:
+                        self.conn.executemany(INSERTS[table], rows)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error al escribir en el diario: {e}")
+            return
+        for rows in self._pending.values():
+            rows.clear()
+        self._pending_count = 0
+
+    def flush(self):
+        """Escribe todos los registros pendientes en una única transacción"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._flush_locked()
+            self.conn.close()
+
+    def record_signal(self, symbol, strategy, signal):
+        self._append('signals', (_now_ms(), symbol, strategy, signal))
+
+    def record_order(self, symbol, side, quantity, reduce_only=False, position_side=None, response=None, test=False):
+        """Registra una orden enviada; test marca las órdenes simuladas del modo --test"""
+        response = response or {}
+        order_id = response.get('orderId')
+        self._append('orders', (
+            _now_ms(), symbol, side, position_side, quantity, int(bool(reduce_only)),
+            str(order_id) if order_id is not None else None, response.get('status'), int(bool(test))
+        ))
+
+    def on_account_event(self, event_type, data):
+        """Listener de AccountState: registra ejecuciones y cambios de balance"""
+        if event_type == 'ORDER_TRADE_UPDATE':
+            if data['execution_type'] == 'TRADE' and data['last_filled_quantity'] > 0:
+                self._append('fills', (
+                    data['trade_time'] or _now_ms(), data['symbol'], str(data['order_id']), data['side'],
+                    data['position_side'], data['last_filled_quantity'], data['last_filled_price'],
+                    data['realized_pnl'], data['commission']
+                ))
+        elif event_type == 'ACCOUNT_UPDATE':
+            ts = _now_ms()
+            for balance in data.get('B', []):
+                self._append('balances', (ts, balance['a'], float(balance['wb']), data.get('m')))
+
+    def save_snapshot(self, name, state):
+        """Guarda (sobrescribe) un snapshot de estado serializable a JSON"""
+        with self._lock:
+            self._flush_locked()
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (name, ts, state) VALUES (?, ?, ?)",
+                    (name, _now_ms(), json.dumps(state, separators=(',', ':')))
+                )
+
+    def load_snapshot(self, name):
+        """
+        Devuelve el último snapshot guardado con ese nombre
+
+        Returns:
+            tuple: (timestamp ms, estado) o None si no existe
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT ts, state FROM snapshots WHERE name = ?", (name,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def pnl_by_symbol(self, since=None):
+        """PnL realizado, comisiones y número de ejecuciones por símbolo"""
+        return self._query(
+            "SELECT symbol, SUM(realized_pnl) AS realized_pnl, SUM(commission) AS commission, "
+            "SUM(realized_pnl) - SUM(commission) AS net_pnl, COUNT(*) AS fills "
+            "FROM fills WHERE ts >= ? GROUP BY symbol ORDER BY net_pnl DESC",
+            (since or 0,)
+        )
+
+    def daily_pnl(self, symbol=None):
+        """PnL neto por día (UTC)"""
+        return self._query(
+            "SELECT date(ts / 1000, 'unixepoch') AS day, SUM(realized_pnl) - SUM(commission) AS net_pnl, "
+            "COUNT(*) AS fills FROM fills WHERE (? IS NULL OR symbol = ?) GROUP BY day ORDER BY day",
+            (symbol, symbol)
+        )
+
+    def trade_stats(self, symbol=None):
+        """Estadísticas de las ejecuciones que cerraron posición (PnL realizado distinto de cero)"""
+        rows = self._query(
+            "SELECT COUNT(*) AS trades, "
+            "SUM(CASE WHEN realized_pnl > 0 THEN 1 ELSE 0 END) AS wins, "
+            "SUM(CASE WHEN realized_pnl < 0 THEN 1 ELSE 0 END) AS losses, "
+            "COALESCE(SUM(realized_pnl), 0) AS total_pnl, COALESCE(AVG(realized_pnl), 0) AS avg_pnl, "
+            "COALESCE(MAX(realized_pnl), 0) AS best, COALESCE(MIN(realized_pnl), 0) AS worst "
+            "FROM fills WHERE realized_pnl != 0 AND (? IS NULL OR symbol = ?)",
+            (symbol, symbol)
+        )
+        stats = rows[0]
+        stats['win_rate'] = stats['wins'] / stats['trades'] if stats['trades'] else 0.0
+        return stats
+
+    def recent_signals(self, limit=20, symbol=None):
+        return self._query(
+            "SELECT ts, symbol, strategy, signal FROM signals WHERE (? IS NULL OR symbol = ?) "
+            "ORDER BY ts DESC LIMIT ?",
+            (symbol, symbol, limit)
+        )
+
+class Checkpointer:
+    """Guarda periódicamente el estado en memoria de los componentes registrados"""
+
+    def __init__(self, journal, interval=60):
+        """
+        Args:
+            journal: TradeJournal donde se guardan los snapshots
+            interval: Segundos entre snapshots
+        """
+        self.journal = journal
+        self.interval = interval
+        self.components = {}
+        self.logger = logging.getLogger(__name__)
+        self._last = time.monotonic()
+
+    def register(self, name, get_state, set_state, max_age=None):
+        """
+        Registra un componente
+
+        Args:
+            name: Nombre único del snapshot
+            get_state: Función sin argumentos que devuelve el estado serializable
+            set_state: Función que recibe el estado guardado
+            max_age: Segundos tras los que el snapshot ya no se restaura (None: sin límite)
+        """
+        self.components[name] = (get_state, set_state, max_age)
+
+    def unregister(self, name):
+        """Guarda el último estado de un componente y deja de vigilarlo"""
+        if name in self.components:
+            self.checkpoint([name])
+            del self.components[name]
+
+    def apply_config(self, config):
+        """Aplica en caliente el intervalo entre snapshots"""
+        self.interval = config.CHECKPOINT_INTERVAL
+
+    def restore(self, names=None):
+        """
+        Restaura el último snapshot de cada componente registrado
+
+        Args:
+            names: Componentes a restaurar (todos por defecto)
+
+        Returns:
+            list: Nombres de los componentes restaurados
+        """
+        restored = []
+        for name, (_, set_state, max_age) in self.components.items():
+            if names is not None and name not in names:
+                continue
+            snapshot = self.journal.load_snapshot(name)
+            if snapshot is None:
+                continue
+            age = (_now_ms() - snapshot[0]) / 1000
+            if max_age is not None and age > max_age:
+                self.logger.info(f"Snapshot de {name} descartado: tiene {age:.0f}s (máximo {max_age:.0f}s)")
+                continue
+            try:
+                set_state(snapshot[1])
+                restored.append(name)
+            except Exception as e:
+                self.logger.error(f"Error al restaurar el estado de {name}: {e}")
+        if restored:
+            self.logger.info(f"Estado restaurado: {', '.join(restored)}")
+        return restored
+
+    def checkpoint(self, names=None):
+        """Guarda el estado de todos los componentes o solo de los indicados"""
+        for name, (get_state, _, _) in self.components.items():
+            if names is not None and name not in names:
+                continue
+            try:
+                self.journal.save_snapshot(name, get_state())
+            except Exception as e:
+                self.logger.error(f"Error al guardar el estado de {name}: {e}")
+        if names is None:
+            self._last = time.monotonic()
+
+    def maybe_checkpoint(self):
+        """Guarda el estado si ha pasado el intervalo; pensado para el bucle principal"""
+        if time.monotonic() - self._last >= self.interval:
+            self.checkpoint()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import struct
+import logging
+import threading
+
+# Formato del log: cabecera MAGIC seguida de registros
+# [tipo: uint8][tiempo monotónico ns: int64][longitud: uint32][payload JSON compacto]
+# Cada ejecución empieza con un registro KIND_SESSION: los tiempos monotónicos
+# solo son comparables dentro de la misma sesión. KIND_STATE guarda el estado
+# restaurado al arrancar (p. ej. la caché de velas) para reproducir igual la sesión
+MAGIC = b'BOTREC1\n'
+RECORD_HEADER = struct.Struct('<BqI')
+
+KIND_REST = 1
+KIND_REST_ERROR = 2
+KIND_STREAM = 3
+KIND_SESSION = 4
+KIND_STATE = 5
+
+class Recorder:
+    """Graba respuestas del exchange y mensajes de streams en un log binario append-only"""
+
+    def __init__(self, path, flush_interval=1.0):
+        """
+        Inicializa el grabador
+
+        Args:
+            path: Ruta del archivo de grabación
+            flush_interval: Segundos máximos que un registro permanece en buffer
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.write(KIND_SESSION, {'started': time.time()})
+        self.flush()
+
+        # El volcado periódico no depende de que lleguen más registros
+        self._flusher = threading.Thread(target=self._flush_loop, name='recorder-flush', daemon=True)
+        self._flusher.start()
+
+    def write(self, kind, payload):
+        """
+        Añade un registro al log
+
+        Args:
+            kind: Tipo de registro (KIND_REST, KIND_REST_ERROR, KIND_STREAM, KIND_SESSION o KIND_STATE)
+            payload: Datos serializables a JSON
+        """
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        header = RECORD_HEADER.pack(kind, time.monotonic_ns(), len(data))
+        with self._lock:
+            self._file.write(header)
+            self._file.write(data)
+
+    def record_rest(self, method, kwargs, result):
+        """Graba la respuesta de una llamada REST"""
+        self.write(KIND_REST, {'m': method, 'k': kwargs, 'r': result})
+
+    def record_rest_error(self, method, kwargs, status_code, text):
+        """Graba una llamada REST que terminó en error del exchange"""
+        self.write(KIND_REST_ERROR, {'m': method, 'k': kwargs, 's': status_code, 't': text})
+
+    def record_stream(self, stream, message):
+        """Graba un mensaje crudo de un stream (user o ticks)"""
+        self.write(KIND_STREAM, {'s': stream, 'd': message})
+
+    def record_state(self, name, state):
+        """Graba un estado restaurado que condiciona las peticiones siguientes"""
+        self.write(KIND_STATE, {'n': name, 's': state})
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._file.close()
+
+class RecordingClient:
+    """Envuelve un cliente de python-binance grabando cada respuesta"""
+
+    def __init__(self, client, recorder):
+        self._client = client
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        recorder = self._recorder
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                # Solo los errores del exchange traen status_code; el resto se propaga sin grabar
+                if hasattr(e, 'status_code'):
+                    text = json.dumps({'code': getattr(e, 'code', 0), 'msg': getattr(e, 'message', str(e))})
+                    recorder.record_rest_error(name, kwargs, e.status_code, text)
+                raise
+            recorder.record_rest(name, kwargs, result)
+            return result
+
+        # Cachear el envoltorio para no recrearlo en cada llamada
+        setattr(self, name, call)
+        return call
+
+def read_records(path):
+    """
+    Lee una grabación registro a registro
+
+    Args:
+        path: Ruta del archivo de grabación
+
+    Yields:
+        tuple: (tipo, tiempo monotónico ns, payload), incluidos los registros KIND_SESSION
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} no es una grabación válida")
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            kind, timestamp, length = RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                # Registro truncado por una caída durante la escritura
+                break
+            yield kind, timestamp, json.loads(data)
+
+def read_sessions(path):
+    """
+    Agrupa los registros de una grabación por sesión
+
+    Las grabaciones anteriores a KIND_SESSION forman una única sesión.
+
+    Args:
+        path: Ruta del archivo de grabación
+
+    Returns:
+        list: Una lista de registros (tipo, tiempo, payload) por sesión, sin las cabeceras
+    """
+    sessions = [[]]
+    for kind, timestamp, payload in read_records(path):
+        if kind == KIND_SESSION:
+            if sessions[-1]:
+                sessions.append([])
+            continue
+        sessions[-1].append((kind, timestamp, payload))
+    return [session for session in sessions if session]
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import random
+import logging
+from collections import defaultdict, deque
+from binance.exceptions import BinanceAPIException
+from core.exchange import BinanceClient
+from core.user_stream import UserDataStream
+from data.recorder import read_sessions, KIND_REST, KIND_REST_ERROR, KIND_STREAM, KIND_STATE
+
+class SimulatedClient:
+    """Sirve una grabación a través de la interfaz de python-binance"""
+
+    def __init__(self, path, speed='fast', latency_ms=0.0, jitter_ms=0.0, seed=0, session=-1):
+        """
+        Inicializa el simulador
+
+        Args:
+            path: Ruta de la grabación generada por Recorder
+            speed: 'fast' (lo más rápido posible) o 'realtime' (respeta los tiempos grabados)
+            latency_ms: Latencia fija inyectada en cada llamada REST
+            jitter_ms: Latencia aleatoria adicional máxima (determinista con seed)
+            seed: Semilla del generador de jitter
+            session: Sesión de la grabación a reproducir (la última por defecto)
+        """
+        if speed not in ('fast', 'realtime'):
+            raise ValueError(f"Velocidad de simulación no soportada: {speed}")
+
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.logger = logging.getLogger(__name__)
+        self._random = random.Random(seed)
+
+        self._responses = defaultdict(deque)  # (método, kwargs) -> registros
+        self._last = {}
+        self._order_id = 0
+        self.streams = []  # (tiempo, stream, mensaje)
+        self.states = {}   # nombre -> estado restaurado durante la sesión grabada
+        self.origin = None
+        self._clock_start = None
+
+        sessions = read_sessions(path)
+        if not sessions:
+            raise ValueError(f"{path} no contiene registros")
+        if len(sessions) > 1:
+            self.logger.info(f"{path} contiene {len(sessions)} sesiones, se reproduce la {session % len(sessions) + 1}")
+
+        for kind, timestamp, payload in sessions[session]:
+            if self.origin is None:
+                self.origin = timestamp
+            if kind in (KIND_REST, KIND_REST_ERROR):
+                self._responses[self._key(payload['m'], payload['k'])].append((timestamp, kind, payload))
+            elif kind == KIND_STREAM:
+                self.streams.append((timestamp, payload['s'], payload['d']))
+            elif kind == KIND_STATE:
+                self.states[payload['n']] = payload['s']
+
+    @staticmethod
+    def _key(method, kwargs):
+        return method, json.dumps(kwargs, sort_keys=True, separators=(',', ':'))
+
+    def wait_until(self, timestamp):
+        """En modo realtime espera hasta el instante grabado relativo al inicio de la réplica"""
+        if self.speed != 'realtime':
+            return
+        now = time.perf_counter()
+        if self._clock_start is None:
+            self._clock_start = now
+        delay = self._clock_start + (timestamp - self.origin) / 1e9 - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def rest_timestamps(self, method):
+        """Tiempos de las respuestas grabadas de un método, en cualquier combinación de argumentos"""
+        return sorted(
+            timestamp
+            for (name, _), queue in self._responses.items() if name == method
+            for timestamp, _, _ in queue
+        )
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self._serve(name, kwargs)
+
+        setattr(self, name, call)
+        return call
+
+    def _serve(self, method, kwargs):
+        """Devuelve la siguiente respuesta grabada para la llamada"""
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        key = self._key(method, kwargs)
+        queue = self._responses.get(key)
+        if queue:
+            timestamp, kind, payload = queue.popleft()
+            self.wait_until(timestamp)
+            if kind == KIND_REST_ERROR:
+                raise BinanceAPIException(None, payload['s'], payload['t'])
+            self._last[key] = payload['r']
+            return payload['r']
+
+        # Agotada la grabación se repite la última respuesta de la misma llamada
+        if key in self._last:
+            return self._last[key]
+
+        # Las órdenes que no coinciden con la grabación se aceptan con una respuesta sintética
+        if method == 'futures_create_order':
+            self._order_id += 1
+            return {'orderId': f"sim-{self._order_id}", 'status': 'NEW', **kwargs}
+
+        text = json.dumps({'code': -1, 'msg': f"Sin respuesta grabada para {method}"})
+        raise BinanceAPIException(None, 404, text)
+
+    def replay_streams(self, handlers):
+        """
+        Reproduce los mensajes de streams grabados en orden
+
+        Args:
+            handlers: Diccionario stream -> función que recibe el mensaje crudo
+        """
+        for timestamp, stream, message in self.streams:
+            handler = handlers.get(stream)
+            if handler:
+                self.wait_until(timestamp)
+                handler(message)
+
+def run_simulation(path, build_strategy, speed='fast', latency_ms=0.0, jitter_ms=0.0, seed=0,
+                   tick_handler=None, session=-1):
+    """
+    Reproduce una grabación a través de BinanceClient y perfila Strategy.execute
+
+    Las ejecuciones de la estrategia se intercalan con los mensajes de streams en
+    el orden original: cada petición de velas grabada marca una llamada a execute().
+
+    Args:
+        path: Ruta de la grabación
+        build_strategy: Función que recibe un BinanceClient y devuelve la estrategia
+        speed: 'fast' o 'realtime'
+        latency_ms: Latencia fija inyectada en cada llamada REST
+        jitter_ms: Latencia aleatoria adicional máxima
+        seed: Semilla del jitter
+        tick_handler: Función opcional que recibe los mensajes del stream de ticks decodificados
+        session: Sesión de la grabación a reproducir (la última por defecto)
+
+    Returns:
+        dict: Número de ejecuciones y latencias de execute() en milisegundos
+    """
+    simulated = SimulatedClient(path, speed, latency_ms, jitter_ms, seed, session)
+    client = BinanceClient(client=simulated)
+    if 'klines' in simulated.states:
+        client.set_kline_state(simulated.states['klines'])
+
+    # El user-data stream solo se reconstruye si la grabación incluye su snapshot inicial
+    if any(stream == 'user' for _, stream, _ in simulated.streams):
+        user_stream = UserDataStream(simulated)
+        try:
+            user_stream.resync()
+            user_stream.synced = True
+            client.user_stream = user_stream
+        except BinanceAPIException as e:
+            simulated.logger.warning(f"Grabación sin snapshot de cuenta, se usarán respuestas REST: {e}")
+
+    strategy = build_strategy(client)
+
+    timeline = [(timestamp, 0, stream, message) for timestamp, stream, message in simulated.streams]
+    timeline.extend((timestamp, 1, 'execute', None) for timestamp in simulated.rest_timestamps('futures_klines'))
+    timeline.sort(key=lambda item: (item[0], item[1]))
+
+    latencies = []
+    for timestamp, _, stream, message in timeline:
+        simulated.wait_until(timestamp)
+        if stream == 'execute':
+            start = time.perf_counter()
+            strategy.execute()
+            latencies.append((time.perf_counter() - start) * 1000)
+        elif stream == 'user' and client.user_stream:
+            client.user_stream.handle_message(message)
+        elif stream == 'ticks' and tick_handler:
+            tick_handler(json.loads(message))
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'executions': count,
+        'stream_messages': len(simulated.streams),
+        'avg_ms': sum(latencies) / count if count else 0.0,
+        'p50_ms': latencies[count // 2] if count else 0.0,
+        'p99_ms': latencies[min(count - 1, int(count * 0.99))] if count else 0.0,
+        'max_ms': latencies[-1] if count else 0.0
+    }
@@ -4,25 +4,130 @@
 import time
 import argparse
 from config.config import Config
+from config.watcher import ConfigWatcher
 from core.exchange import BinanceClient
-from strategies.moving_average import MovingAverageStrategy
-from strategies.rsi_strategy import RSIStrategy
+from strategies.factory import STRATEGIES, create_strategy
+from core.tick_stream import ScalpingEngine, TickStream, replay_ticks
+from core.sharded_runtime import ShardedRuntime
+from data.recorder import Recorder
+from data.simulator import run_simulation
+from data.journal import TradeJournal, Checkpointer
 from utils.logger import setup_logger
 
 logger = setup_logger()
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Binance Futures Trading Bot')
-    parser.add_argument('--strategy', type=str, default='ma', choices=['ma', 'rsi'],
-                        help='Trading strategy to use (ma: Moving Average, rsi: RSI)')
+    parser.add_argument('--strategy', type=str, default='ma', choices=STRATEGIES,
+                        help='Trading strategy to use (ma: Moving Average, rsi: RSI, scalp: tick-level EMA scalping)')
     parser.add_argument('--symbol', type=str, default='BTCUSDT',
                         help='Trading pair symbol (e.g., BTCUSDT, ETHUSDC)')
     parser.add_argument('--interval', type=str, default='1h',
                         help='Candlestick interval (e.g., 1m, 5m, 15m, 1h, 4h, 1d)')
     parser.add_argument('--test', action='store_true',
                         help='Run in test mode (no real trades)')
+    parser.add_argument('--no-user-stream', action='store_true',
+                        help='Poll balances and positions via REST instead of the user-data stream')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Replay a recorded tick file at max speed through the scalp strategy and report events per second')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Run the sharded multi-process runtime with this many worker processes (0: single process)')
+    parser.add_argument('--symbols', type=str, default=None,
+                        help='Comma-separated symbols for the sharded runtime (defaults to --symbol)')
+    parser.add_argument('--strategies', type=str, default=None,
+                        help='Comma-separated strategies run on every symbol in the sharded runtime (defaults to --strategy)')
+    parser.add_argument('--rate-limit', type=float, default=20,
+                        help='Maximum exchange requests per second issued by the order gateway')
+    parser.add_argument('--journal', type=str, default='data/journal.db',
+                        help='SQLite trade journal and state snapshot database')
+    parser.add_argument('--no-journal', action='store_true',
+                        help='Disable the trade journal and state checkpointing')
+    parser.add_argument('--record', type=str, default=None,
+                        help='Record every exchange response and stream message to a binary log')
+    parser.add_argument('--simulate', type=str, default=None,
+                        help='Replay a recording through BinanceClient and profile Strategy.execute')
+    parser.add_argument('--speed', type=str, default='fast', choices=['fast', 'realtime'],
+                        help='Simulation speed (fast: as fast as possible, realtime: recorded wall-clock pacing)')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Latency injected into every simulated REST call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='Maximum random latency added to every simulated REST call')
     return parser.parse_args()
 
+def run_replay(args, config):
+    """Reproduce un archivo de ticks sin enviar órdenes y muestra el rendimiento"""
+    strategy = create_strategy('scalp', None, args.symbol, args.interval, config)
+    engine = ScalpingEngine(strategy, latency_budget_us=config.SCALP_LATENCY_BUDGET_US, dry_run=True)
+    stats = replay_ticks(args.replay, engine)
+    logger.info(
+        f"Replay de {stats['events']} eventos en {stats['elapsed_s']:.3f}s: "
+        f"{stats['events_per_second']:.0f} eventos/s, latencia media {stats['avg_latency_us']:.1f}us, "
+        f"máxima {stats['max_latency_us']:.1f}us, {stats['over_budget']} fuera de presupuesto, "
+        f"{stats['signals']} señales"
+    )
+
+def run_simulation_mode(args, config):
+    """Reproduce una grabación a través de BinanceClient y perfila la estrategia"""
+    engines = []
+    
+    def make_strategy(client):
+        strategy = create_strategy(args.strategy, client, args.symbol, args.interval, config)
+        if args.strategy == 'scalp':
+            # Sin cooldown: depende del reloj real y rompería el determinismo de la réplica
+            engines.append(ScalpingEngine(strategy, latency_budget_us=config.SCALP_LATENCY_BUDGET_US, signal_cooldown=0))
+        return strategy
+    
+    def on_tick(message):
+        engines[0].on_message(message)
+    
+    stats = run_simulation(
+        args.simulate,
+        make_strategy,
+        speed=args.speed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tick_handler=on_tick if args.strategy == 'scalp' else None
+    )
+    logger.info(
+        f"Simulación: {stats['executions']} ejecuciones y {stats['stream_messages']} mensajes de stream; "
+        f"execute() media {stats['avg_ms']:.3f}ms, p50 {stats['p50_ms']:.3f}ms, "
+        f"p99 {stats['p99_ms']:.3f}ms, máxima {stats['max_ms']:.3f}ms"
+    )
+    if engines:
+        logger.info(f"Scalping: {engines[0].stats()}")
+
+def run_sharded(args, config):
+    """Ejecuta los pares (símbolo, estrategia) en el runtime multiproceso"""
+    symbols = args.symbols.split(',') if args.symbols else [args.symbol]
+    strategies = args.strategies.split(',') if args.strategies else [args.strategy]
+    for name in strategies:
+        if name not in STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {name}")
+    
+    runtime = ShardedRuntime(
+        symbols=symbols,
+        strategies=strategies,
+        interval=args.interval,
+        config=config,
+        workers=args.workers,
+        test_mode=args.test,
+        rate_limit=args.rate_limit,
+        user_stream=not args.no_user_stream,
+        journal_path=None if args.no_journal else args.journal,
+        record_path=args.record,
+        watcher=ConfigWatcher(config)
+    )
+    logger.info(f"Iniciando runtime con {args.workers} workers para {len(symbols)} símbolos y estrategias {strategies}")
+    
+    try:
+        runtime.run()
+    except KeyboardInterrupt:
+        logger.info("Bot detenido manualmente")
+    except Exception as e:
+        logger.error(f"Error en la ejecución del runtime: {e}")
+    finally:
+        logger.info("Cerrando bot")
+
 def main():
     args = parse_arguments()
     
@@ -30,39 +135,102 @@ def main():
     config = Config()
     config.load_config()
     
+    if args.replay:
+        run_replay(args, config)
+        return
+    
+    if args.simulate:
+        run_simulation_mode(args, config)
+        return
+    
+    if args.workers > 0:
+        run_sharded(args, config)
+        return
+    
     # Inicializar cliente de Binance
-    client = BinanceClient(test_mode=args.test)
+    recorder = Recorder(args.record) if args.record else None
+    client = BinanceClient(test_mode=args.test, recorder=recorder)
+    if config.HEDGE_MODE != client.hedge_mode:
+        if args.test:
+            # En modo test no se modifica la configuración real de la cuenta
+            logger.warning(f"HEDGE_MODE={config.HEDGE_MODE} no coincide con la cuenta; "
+                           f"se opera en modo {'hedge' if client.hedge_mode else 'one-way'}")
+        else:
+            client.set_position_mode(config.HEDGE_MODE)
+    if not args.no_user_stream:
+        client.start_user_stream()
     
     # Seleccionar estrategia
-    if args.strategy == 'ma':
-        strategy = MovingAverageStrategy(
-            client=client,
-            symbol=args.symbol,
-            interval=args.interval,
-            short_window=config.MA_SHORT_WINDOW,
-            long_window=config.MA_LONG_WINDOW
-        )
-    elif args.strategy == 'rsi':
-        strategy = RSIStrategy(
-            client=client,
-            symbol=args.symbol,
-            interval=args.interval,
-            rsi_period=config.RSI_PERIOD,
-            rsi_overbought=config.RSI_OVERBOUGHT,
-            rsi_oversold=config.RSI_OVERSOLD
-        )
+    strategy = create_strategy(args.strategy, client, args.symbol, args.interval, config)
+    
+    # Recarga en caliente de la configuración
+    watcher = ConfigWatcher(config)
+    watcher.subscribe(strategy.apply_config, args.symbol)
+    
+    leverage = {}
+    def apply_leverage(symbol_config):
+        if not args.test and leverage.get(args.symbol) != symbol_config.LEVERAGE:
+            client.set_leverage(args.symbol, symbol_config.LEVERAGE)
+            leverage[args.symbol] = symbol_config.LEVERAGE
+    
+    apply_leverage(config.for_symbol(args.symbol))
+    watcher.subscribe(apply_leverage, args.symbol)
+    
+    # Diario de operaciones y restauración del estado del último arranque
+    journal = None
+    checkpointer = None
+    if not args.no_journal:
+        journal = TradeJournal(args.journal)
+        strategy.attach_journal(journal)
+        if client.user_stream:
+            client.user_stream.state.add_listener(journal.on_account_event)
+        
+        checkpointer = Checkpointer(journal, interval=config.CHECKPOINT_INTERVAL)
+        watcher.subscribe(checkpointer.apply_config)
+        checkpointer.register(f"strategy:{args.symbol}:{args.strategy}", strategy.get_state, strategy.set_state,
+                              max_age=strategy.state_max_age())
+        checkpointer.register('klines', client.get_kline_state, client.set_kline_state)
+        checkpointer.restore()
     
     logger.info(f"Iniciando bot con estrategia {args.strategy} para {args.symbol} en intervalo {args.interval}")
     
     try:
-        while True:
-            strategy.execute()
-            time.sleep(config.CHECK_INTERVAL)
+        if args.strategy == 'scalp':
+            engine = ScalpingEngine(
+                strategy,
+                latency_budget_us=config.SCALP_LATENCY_BUDGET_US,
+                signal_cooldown=config.SCALP_SIGNAL_COOLDOWN
+            )
+            engine.apply_config(config.for_symbol(args.symbol))
+            watcher.subscribe(engine.apply_config, args.symbol)
+            
+            # La recarga se comprueba en el mismo hilo que procesa los ticks
+            def on_message(message):
+                watcher.poll()
+                engine.on_message(message)
+                if checkpointer:
+                    checkpointer.maybe_checkpoint()
+            
+            TickStream([args.symbol], on_message, recorder=recorder).start(block=True)
+        else:
+            while True:
+                watcher.poll()
+                strategy.execute()
+                if checkpointer:
+                    checkpointer.maybe_checkpoint()
+                time.sleep(config.CHECK_INTERVAL)
     except KeyboardInterrupt:
         logger.info("Bot detenido manualmente")
     except Exception as e:
         logger.error(f"Error en la ejecución del bot: {e}")
     finally:
+        client.stop_user_stream()
+        if checkpointer:
+            checkpointer.checkpoint()
+        if journal:
+            journal.close()
+        if recorder:
+            recorder.close()
         logger.info("Cerrando bot")
 
 if __name__ == "__main__":
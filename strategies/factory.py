@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from strategies.moving_average import MovingAverageStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.micro_scalping import MicroScalpingStrategy
+
+STRATEGIES = ('ma', 'rsi', 'scalp')
+
+def create_strategy(name, client, symbol, interval, config):
+    """
+    Construye una estrategia a partir de su nombre y la configuración
+    
+    Args:
+        name: 'ma', 'rsi' o 'scalp'
+        client: Cliente de Binance (o compatible)
+        symbol: Símbolo de trading
+        interval: Intervalo de velas
+        config: Config global (se aplican las sobrescrituras del símbolo)
+        
+    Returns:
+        Strategy: Estrategia configurada
+    """
+    # Parámetros con las sobrescrituras del símbolo aplicadas
+    config = config.for_symbol(symbol)
+    
+    if name == 'ma':
+        strategy = MovingAverageStrategy(
+            client=client,
+            symbol=symbol,
+            interval=interval,
+            short_window=config.MA_SHORT_WINDOW,
+            long_window=config.MA_LONG_WINDOW
+        )
+    elif name == 'rsi':
+        strategy = RSIStrategy(
+            client=client,
+            symbol=symbol,
+            interval=interval,
+            rsi_period=config.RSI_PERIOD,
+            rsi_overbought=config.RSI_OVERBOUGHT,
+            rsi_oversold=config.RSI_OVERSOLD
+        )
+    elif name == 'scalp':
+        strategy = MicroScalpingStrategy(
+            client=client,
+            symbol=symbol,
+            interval=interval,
+            bar_ms=config.SCALP_BAR_MS,
+            fast_period=config.SCALP_FAST_EMA,
+            slow_period=config.SCALP_SLOW_EMA,
+            max_spread=config.SCALP_MAX_SPREAD
+        )
+    else:
+        raise ValueError(f"Estrategia desconocida: {name}")
+    
+    # Aplicar también los parámetros de riesgo
+    strategy.apply_config(config)
+    return strategy
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+from core.strategy import Strategy
+from core.risk_management import RiskManager
+from core.tick_stream import MicroBarAggregator
+from utils.indicators import StreamingEMA
+
+class MicroScalpingStrategy(Strategy):
+    """Estrategia de scalping sobre micro-barras con cruce de EMAs y filtro de spread"""
+    
+    def __init__(self, client, symbol, interval, bar_ms=1000, fast_period=5, slow_period=20,
+                 max_spread=0.0005, capacity=500):
+        super().__init__(client, symbol, interval)
+        self.bars = MicroBarAggregator(bar_ms, capacity)
+        self.fast_ema = StreamingEMA(fast_period)
+        self.slow_ema = StreamingEMA(slow_period)
+        self.max_spread = max_spread
+        self.bid = None
+        self.ask = None
+        self._diff = None
+        self._prev_diff = None
+        self.risk_manager = RiskManager(client)
+    
+    def apply_config(self, config):
+        """
+        Actualiza los parámetros en caliente conservando las micro-barras
+        
+        Si cambian los períodos, las EMAs se recalculan sobre las barras cerradas
+        del buffer en lugar de empezar de cero.
+        """
+        super().apply_config(config)
+        self.max_spread = config.SCALP_MAX_SPREAD
+        # El nuevo tamaño de barra se aplica a partir de la próxima micro-barra
+        self.bars.bar_ms = config.SCALP_BAR_MS
+        
+        if config.SCALP_FAST_EMA != self.fast_ema.period or config.SCALP_SLOW_EMA != self.slow_ema.period:
+            self._reseed_indicators(config.SCALP_FAST_EMA, config.SCALP_SLOW_EMA)
+    
+    def _reseed_indicators(self, fast_period, slow_period):
+        """Recalcula las EMAs sobre las micro-barras cerradas del buffer"""
+        self.fast_ema = StreamingEMA(fast_period)
+        self.slow_ema = StreamingEMA(slow_period)
+        self._diff = None
+        self._prev_diff = None
+        for close in self.bars.closes.last()[:-1]:
+            self._prev_diff = self._diff
+            self._diff = self.fast_ema.update(close) - self.slow_ema.update(close)
+    
+    def get_state(self):
+        """Micro-barras y libro actuales para reanudar sin esperar a calentar los indicadores"""
+        bars = self.bars
+        return {
+            'bar_ms': bars.bar_ms,
+            'timestamps': bars.timestamps.last(),
+            'opens': bars.opens.last(),
+            'highs': bars.highs.last(),
+            'lows': bars.lows.last(),
+            'closes': bars.closes.last(),
+            'volumes': bars.volumes.last(),
+            'bid': self.bid,
+            'ask': self.ask
+        }
+    
+    def state_max_age(self):
+        """
+        Segundos que cubre el buffer de micro-barras
+        
+        Un snapshot más antiguo dejaría un hueco entre la última barra restaurada y
+        los ticks nuevos que podría disparar un cruce falso.
+        """
+        return self.bars.bar_ms * self.bars.closes.capacity / 1000
+    
+    def set_state(self, state):
+        """Restaura las micro-barras y recalcula los indicadores"""
+        if state.get('bar_ms') != self.bars.bar_ms:
+            # Barras de otra duración no son comparables
+            return
+        bars = self.bars
+        for name in ('timestamps', 'opens', 'highs', 'lows', 'closes', 'volumes'):
+            buffer = getattr(bars, name)
+            for value in state[name]:
+                buffer.append(value)
+        if state['timestamps']:
+            bars._bar_start = state['timestamps'][-1]
+        self.bid = state.get('bid')
+        self.ask = state.get('ask')
+        self._reseed_indicators(self.fast_ema.period, self.slow_ema.period)
+    
+    def on_tick(self, event):
+        """
+        Actualiza micro-barras e indicadores con un tick y evalúa la señal al cerrar cada barra
+        
+        Args:
+            event: Evento normalizado de trade o libro
+            
+        Returns:
+            str: 'BUY', 'SELL' o None
+        """
+        if event['type'] == 'book':
+            self.bid = event['bid']
+            self.ask = event['ask']
+            return None
+        
+        if not self.bars.update(event['price'], event['quantity'], event['time']):
+            return None
+        
+        # La micro-barra recién cerrada es la penúltima del buffer
+        close = self.bars.closes[-2]
+        self._prev_diff = self._diff
+        self._diff = self.fast_ema.update(close) - self.slow_ema.update(close)
+        return self.analyze()
+    
+    def analyze(self):
+        """
+        Analiza el cruce de EMAs de la última micro-barra cerrada
+        
+        Returns:
+            str: 'BUY', 'SELL' o None
+        """
+        if self._prev_diff is None or not self.slow_ema.is_ready():
+            return None
+        
+        # No operar con el libro demasiado abierto
+        if self.bid and self.ask:
+            mid = (self.bid + self.ask) / 2
+            if (self.ask - self.bid) / mid > self.max_spread:
+                return None
+        
+        # Cruce alcista: EMA rápida cruza por encima de la EMA lenta
+        if self._prev_diff <= 0 < self._diff:
+            return 'BUY'
+        
+        # Cruce bajista: EMA rápida cruza por debajo de la EMA lenta
+        elif self._prev_diff >= 0 > self._diff:
+            return 'SELL'
+        
+        return None
+    
+    def calculate_position_size(self, signal):
+        """
+        Calcula el tamaño de la posición usando el último precio del libro
+        
+        Args:
+            signal: 'BUY' o 'SELL'
+            
+        Returns:
+            float: Cantidad a comprar/vender
+        """
+        price = self.ask if signal == 'BUY' else self.bid
+        if not price and len(self.bars):
+            price = self.bars.closes[-1]
+        return self.risk_manager.calculate_position_size(self.symbol, price=price)
@@ -14,6 +14,12 @@ class MovingAverageStrategy(Strategy):
         self.long_window = long_window
         self.risk_manager = RiskManager(client)
     
+    def apply_config(self, config):
+        """Actualiza las ventanas de las medias móviles en caliente"""
+        super().apply_config(config)
+        self.short_window = config.MA_SHORT_WINDOW
+        self.long_window = config.MA_LONG_WINDOW
+    
     def analyze(self):
         """
         Analiza el mercado usando cruce de medias móviles
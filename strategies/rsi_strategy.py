@@ -15,6 +15,13 @@ class RSIStrategy(Strategy):
         self.rsi_oversold = rsi_oversold
         self.risk_manager = RiskManager(client)
     
+    def apply_config(self, config):
+        """Actualiza el período y los niveles del RSI en caliente"""
+        super().apply_config(config)
+        self.rsi_period = config.RSI_PERIOD
+        self.rsi_overbought = config.RSI_OVERBOUGHT
+        self.rsi_oversold = config.RSI_OVERSOLD
+    
     def analyze(self):
         """
         Analiza el mercado usando el indicador RSI
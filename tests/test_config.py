@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from config.config import Config, ConfigError, SCHEMA
+
+def test_defaults_match_schema():
+    config = Config()
+    for name, setting in SCHEMA.items():
+        assert getattr(config, name) == setting.default
+    assert config.SYMBOLS == {}
+
+def test_values_are_normalized_and_typed():
+    values = Config().validate({'RSI_OVERBOUGHT': 80, 'LEVERAGE': 5})
+    assert values['RSI_OVERBOUGHT'] == 80.0 and isinstance(values['RSI_OVERBOUGHT'], float)
+
+    with pytest.raises(ConfigError):
+        Config().validate({'LEVERAGE': 2.5})
+    with pytest.raises(ConfigError):
+        Config().validate({'LEVERAGE': True})
+    with pytest.raises(ConfigError):
+        Config().validate({'HEDGE_MODE': 1})
+
+def test_ranges_choices_and_unknown_keys():
+    for data in ({'LEVERAGE': 0}, {'LEVERAGE': 126}, {'ORDER_TYPE': 'STOP'}, {'UNKNOWN': 1}):
+        with pytest.raises(ConfigError):
+            Config().validate(data)
+
+def test_cross_field_rules():
+    with pytest.raises(ConfigError, match='MA_SHORT_WINDOW'):
+        Config().validate({'MA_SHORT_WINDOW': 30})
+    with pytest.raises(ConfigError, match='RSI_OVERSOLD'):
+        Config().validate({'RSI_OVERSOLD': 70, 'RSI_OVERBOUGHT': 70})
+    Config().validate({'MA_SHORT_WINDOW': 30, 'MA_LONG_WINDOW': 40})
+
+def test_all_errors_are_reported_together():
+    with pytest.raises(ConfigError) as error:
+        Config().validate({'LEVERAGE': 0, 'ORDER_TYPE': 'STOP'})
+    assert 'LEVERAGE' in str(error.value) and 'ORDER_TYPE' in str(error.value)
+
+def test_symbol_overrides_are_validated_against_global_values():
+    config = Config()
+    config.update({'SYMBOLS': {'ETHUSDT': {'LEVERAGE': 3, 'MA_SHORT_WINDOW': 5}}})
+    eth = config.for_symbol('ETHUSDT')
+    assert (eth.LEVERAGE, eth.MA_SHORT_WINDOW, eth.MA_LONG_WINDOW) == (3, 5, 21)
+    assert config.for_symbol('BTCUSDT').LEVERAGE == 2
+
+    with pytest.raises(ConfigError, match='SYMBOLS.ETHUSDT'):
+        config.validate({'SYMBOLS': {'ETHUSDT': {'MA_SHORT_WINDOW': 25}}})
+    with pytest.raises(ConfigError, match='SYMBOLS.ETHUSDT'):
+        config.validate({'SYMBOLS': {'ETHUSDT': {'UNKNOWN': 1}}})
+    with pytest.raises(ConfigError):
+        config.validate({'SYMBOLS': []})
+
+def test_symbol_rules_do_not_repeat_global_errors():
+    with pytest.raises(ConfigError) as error:
+        Config().validate({'MA_SHORT_WINDOW': 30, 'SYMBOLS': {'ETHUSDT': {'LEVERAGE': 3}}})
+    assert 'SYMBOLS.ETHUSDT' not in str(error.value)
+
+def test_invalid_update_changes_nothing():
+    config = Config()
+    with pytest.raises(ConfigError):
+        config.update({'LEVERAGE': 10, 'ORDER_TYPE': 'STOP'})
+    assert config.LEVERAGE == 2
+
+def test_removed_keys_return_to_defaults():
+    config = Config()
+    config.update({'LEVERAGE': 5, 'SYMBOLS': {'ETHUSDT': {'LEVERAGE': 3}}})
+
+    changed = config.update({})
+
+    assert sorted(changed) == ['LEVERAGE', 'SYMBOLS']
+    assert config.LEVERAGE == 2
+    assert config.SYMBOLS == {}
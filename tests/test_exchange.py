@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from core.exchange import BinanceClient
+
+MINUTE = 60000
+
+def kline(timestamp, close):
+    return [timestamp, str(close), str(close), str(close), str(close), '1.0']
+
+class FakeClient:
+    """Exchange con una vela por minuto; la última sigue abierta"""
+
+    def __init__(self, count):
+        self.klines = [kline(i * MINUTE, i) for i in range(count)]
+        self.requests = []
+
+    def ping(self):
+        return {}
+
+    def futures_get_position_mode(self):
+        return {'dualSidePosition': False}
+
+    def futures_klines(self, symbol, interval, limit, startTime=None):
+        self.requests.append({'limit': limit, 'startTime': startTime})
+        if startTime is None:
+            return self.klines[-limit:]
+        return [k for k in self.klines if k[0] >= startTime][:limit]
+
+    def advance(self, count, last_close=None):
+        """Cierra la vela abierta (opcionalmente con otro precio) y abre count velas nuevas"""
+        if last_close is not None:
+            self.klines[-1] = kline(self.klines[-1][0], last_close)
+        start = self.klines[-1][0] + MINUTE
+        self.klines += [kline(start + i * MINUTE, len(self.klines) + i) for i in range(count)]
+
+def test_first_request_downloads_full_history():
+    fake = FakeClient(200)
+    client = BinanceClient(client=fake)
+
+    candles = client.get_historical_klines('BTCUSDT', '1m', limit=100)
+
+    assert len(candles) == 100 and candles[-1]['timestamp'] == 199 * MINUTE
+    assert fake.requests == [{'limit': 100, 'startTime': None}]
+
+def test_new_candles_are_merged_incrementally():
+    fake = FakeClient(200)
+    client = BinanceClient(client=fake)
+    client.get_historical_klines('BTCUSDT', '1m', limit=100)
+    fake.advance(3, last_close=500)
+
+    candles = client.get_historical_klines('BTCUSDT', '1m', limit=100)
+
+    assert fake.requests[-1] == {'limit': BinanceClient.KLINE_INCREMENTAL_LIMIT, 'startTime': 199 * MINUTE}
+    assert candles == client._parse_klines(fake.klines[-100:])
+    # La vela que seguía abierta se sustituye por su versión actualizada
+    assert candles[-4]['close'] == 500
+
+def test_gap_larger_than_incremental_limit_forces_full_refetch():
+    fake = FakeClient(200)
+    client = BinanceClient(client=fake)
+    client.get_historical_klines('BTCUSDT', '1m', limit=100)
+    fake.advance(BinanceClient.KLINE_INCREMENTAL_LIMIT + 10)
+
+    candles = client.get_historical_klines('BTCUSDT', '1m', limit=100)
+
+    assert fake.requests[-1] == {'limit': 100, 'startTime': None}
+    assert candles == client._parse_klines(fake.klines[-100:])
+
+def test_restored_cache_is_updated_incrementally():
+    fake = FakeClient(150)
+    client = BinanceClient(client=fake)
+    client.set_kline_state({'BTCUSDT|1m': client._parse_klines(fake.klines[:-10])})
+
+    candles = client.get_historical_klines('BTCUSDT', '1m', limit=100)
+
+    assert fake.requests == [{'limit': BinanceClient.KLINE_INCREMENTAL_LIMIT, 'startTime': 139 * MINUTE}]
+    assert candles == client._parse_klines(fake.klines[-100:])
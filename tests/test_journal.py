@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import pytest
+from data.journal import TradeJournal, Checkpointer, _now_ms
+
+@pytest.fixture
+def journal(tmp_path):
+    # Sin volcado por tiempo durante el test: solo por lote, consulta o cierre
+    journal = TradeJournal(str(tmp_path / 'journal.db'), batch_size=3, flush_interval=3600)
+    yield journal
+    journal.close()
+
+def stored(journal, table):
+    conn = sqlite3.connect(journal.path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def fill(symbol, realized_pnl, commission=0.0, order_id=1):
+    return {
+        'execution_type': 'TRADE', 'last_filled_quantity': 1.0, 'trade_time': _now_ms(), 'symbol': symbol,
+        'order_id': order_id, 'side': 'SELL', 'position_side': 'BOTH', 'last_filled_price': 100.0,
+        'realized_pnl': realized_pnl, 'commission': commission
+    }
+
+def test_records_are_written_in_batches(journal):
+    journal.record_signal('BTCUSDT', 'ma', 'BUY')
+    journal.record_order('BTCUSDT', 'BUY', 0.1, response={'orderId': 7, 'status': 'NEW'})
+    assert stored(journal, 'signals') == 0 and stored(journal, 'orders') == 0
+
+    journal.record_signal('ETHUSDT', 'ma', 'SELL')
+    assert stored(journal, 'signals') == 2 and stored(journal, 'orders') == 1
+
+def test_queries_flush_pending_records(journal):
+    journal.record_signal('BTCUSDT', 'rsi', 'BUY')
+
+    signals = journal.recent_signals()
+
+    assert [(s['symbol'], s['strategy'], s['signal']) for s in signals] == [('BTCUSDT', 'rsi', 'BUY')]
+
+def test_only_trade_executions_are_journaled(journal):
+    journal.on_account_event('ORDER_TRADE_UPDATE', dict(fill('BTCUSDT', 0.0), execution_type='NEW'))
+    journal.on_account_event('ORDER_TRADE_UPDATE', fill('BTCUSDT', 0.0))
+    journal.on_account_event('ACCOUNT_UPDATE', {'m': 'ORDER', 'B': [{'a': 'USDT', 'wb': '100.5'}]})
+    journal.flush()
+
+    assert stored(journal, 'fills') == 1 and stored(journal, 'balances') == 1
+
+def test_pnl_by_symbol_nets_commissions(journal):
+    for event in (fill('BTCUSDT', 10.0, 1.0), fill('BTCUSDT', -4.0, 1.0), fill('ETHUSDT', 1.0, 0.5)):
+        journal.on_account_event('ORDER_TRADE_UPDATE', event)
+
+    rows = journal.pnl_by_symbol()
+
+    assert [(r['symbol'], r['realized_pnl'], r['net_pnl'], r['fills']) for r in rows] == [
+        ('BTCUSDT', 6.0, 4.0, 2), ('ETHUSDT', 1.0, 0.5, 1)
+    ]
+    assert journal.pnl_by_symbol(since=_now_ms() + 60000) == []
+
+def test_trade_stats_ignore_opening_fills(journal):
+    for event in (fill('BTCUSDT', 0.0), fill('BTCUSDT', 3.0), fill('BTCUSDT', -1.0), fill('BTCUSDT', 2.0),
+                  fill('ETHUSDT', -5.0)):
+        journal.on_account_event('ORDER_TRADE_UPDATE', event)
+
+    stats = journal.trade_stats('BTCUSDT')
+
+    assert (stats['trades'], stats['wins'], stats['losses']) == (3, 2, 1)
+    assert (stats['total_pnl'], stats['best'], stats['worst']) == (4.0, 3.0, -1.0)
+    assert stats['win_rate'] == pytest.approx(2 / 3)
+    assert journal.trade_stats()['trades'] == 4
+    assert journal.trade_stats('XRPUSDT')['win_rate'] == 0.0
+
+class Component:
+    def __init__(self, state=None):
+        self.state = state
+
+    def get_state(self):
+        return self.state
+
+    def set_state(self, state):
+        self.state = state
+
+def age_snapshot(journal, name, seconds):
+    with journal.conn:
+        journal.conn.execute("UPDATE snapshots SET ts = ? WHERE name = ?", (_now_ms() - seconds * 1000, name))
+
+def test_restore_skips_snapshots_older_than_max_age(journal):
+    journal.save_snapshot('fresh', {'n': 1})
+    journal.save_snapshot('stale', {'n': 2})
+    journal.save_snapshot('unbounded', {'n': 3})
+    for name in ('stale', 'unbounded'):
+        age_snapshot(journal, name, 600)
+
+    components = {name: Component() for name in ('fresh', 'stale', 'unbounded')}
+    checkpointer = Checkpointer(journal)
+    checkpointer.register('fresh', components['fresh'].get_state, components['fresh'].set_state, max_age=300)
+    checkpointer.register('stale', components['stale'].get_state, components['stale'].set_state, max_age=300)
+    checkpointer.register('unbounded', components['unbounded'].get_state, components['unbounded'].set_state)
+
+    assert checkpointer.restore() == ['fresh', 'unbounded']
+    assert [components[name].state for name in ('fresh', 'stale', 'unbounded')] == [{'n': 1}, None, {'n': 3}]
+
+def test_restore_only_named_components(journal):
+    journal.save_snapshot('a', 1)
+    journal.save_snapshot('b', 2)
+    a, b = Component(), Component()
+    checkpointer = Checkpointer(journal)
+    checkpointer.register('a', a.get_state, a.set_state)
+    checkpointer.register('b', b.get_state, b.set_state)
+
+    assert checkpointer.restore(['b']) == ['b']
+    assert (a.state, b.state) == (None, 2)
+
+def test_unregister_saves_final_state(journal):
+    component = Component({'position': 1})
+    checkpointer = Checkpointer(journal)
+    checkpointer.register('strategy', component.get_state, component.set_state)
+    component.state = {'position': 0}
+
+    checkpointer.unregister('strategy')
+    component.state = {'position': 5}
+    checkpointer.checkpoint()
+
+    assert journal.load_snapshot('strategy')[1] == {'position': 0}
+    assert 'strategy' not in checkpointer.components
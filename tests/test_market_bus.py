@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from core.market_bus import MarketBus, KIND_CANDLE, KIND_TRADE
+
+@pytest.fixture
+def bus():
+    bus = MarketBus(capacity=8, create=True)
+    yield bus
+    bus.close()
+
+def test_reader_receives_records_in_order(bus):
+    reader = bus.reader()
+    bus.publish(KIND_TRADE, 1, 1000, 100.0, 0.5, 1.0)
+    bus.publish(KIND_CANDLE, 0, 2000, 1.0, 2.0, 0.5, 1.5, 10.0)
+
+    assert reader.poll() == [
+        (KIND_TRADE, 1, 1000, 100.0, 0.5, 1.0, 0.0, 0.0),
+        (KIND_CANDLE, 0, 2000, 1.0, 2.0, 0.5, 1.5, 10.0),
+    ]
+    assert reader.poll() == []
+    assert reader.lapped == 0
+
+def test_reader_starts_at_latest_record(bus):
+    bus.publish(KIND_TRADE, 0, 1, 1.0)
+    reader = bus.reader()
+    bus.publish(KIND_TRADE, 0, 2, 2.0)
+    assert [record[2] for record in reader.poll()] == [2]
+    assert [record[2] for record in bus.reader(from_start=True).poll()] == [1, 2]
+
+def test_lapped_reader_skips_overwritten_records(bus):
+    reader = bus.reader()
+    for timestamp in range(1, 21):
+        bus.publish(KIND_TRADE, 0, timestamp, float(timestamp))
+
+    records = reader.poll()
+    # Solo quedan los últimos capacity registros; el resto se cuenta como perdido
+    assert [record[2] for record in records] == list(range(13, 21))
+    assert reader.lapped == 12
+
+def test_poll_respects_max_items(bus):
+    reader = bus.reader()
+    for timestamp in range(1, 6):
+        bus.publish(KIND_TRADE, 0, timestamp)
+    assert len(reader.poll(max_items=3)) == 3
+    assert [record[2] for record in reader.poll()] == [4, 5]
+
+def test_second_process_handle_reads_same_segment(bus):
+    other = MarketBus(bus.name)
+    try:
+        reader = other.reader()
+        bus.publish(KIND_TRADE, 2, 5, 42.0)
+        assert reader.poll()[0][:4] == (KIND_TRADE, 2, 5, 42.0)
+        assert other.capacity == bus.capacity
+    finally:
+        other.close()
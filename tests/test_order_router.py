@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from core.order_router import OrderRouter, net_exposure, plan_orders
+
+def leg(amount):
+    return {'symbol': 'BTCUSDT', 'amount': amount, 'entry_price': 100.0, 'unrealized_pnl': 0.0, 'leverage': 2}
+
+def test_net_exposure_sums_all_legs():
+    assert net_exposure({'LONG': leg(0.5), 'SHORT': leg(-0.25)}) == 0.25
+    assert net_exposure({}) == 0
+
+def test_one_way_flip_is_a_single_order():
+    orders = plan_orders(-0.2, {'BOTH': leg(0.5)})
+    assert orders == [{'side': 'SELL', 'quantity': 0.7, 'position_side': None, 'reduce_only': False}]
+
+def test_one_way_partial_close_is_reduce_only():
+    orders = plan_orders(0.2, {'BOTH': leg(0.5)})
+    assert orders == [{'side': 'SELL', 'quantity': 0.3, 'position_side': None, 'reduce_only': True}]
+
+def test_one_way_close_to_flat_is_reduce_only():
+    orders = plan_orders(0.0, {'BOTH': leg(-0.4)})
+    assert orders == [{'side': 'BUY', 'quantity': 0.4, 'position_side': None, 'reduce_only': True}]
+
+def test_one_way_increase_and_open_are_not_reduce_only():
+    assert plan_orders(0.8, {'BOTH': leg(0.5)})[0]['reduce_only'] is False
+    assert plan_orders(-0.1, {})[0] == {'side': 'SELL', 'quantity': 0.1, 'position_side': None, 'reduce_only': False}
+
+def test_no_orders_when_already_at_target():
+    assert plan_orders(0.5, {'BOTH': leg(0.5)}) == []
+    # Diferencias por debajo de la precisión no generan órdenes
+    assert plan_orders(0.5004, {'BOTH': leg(0.5)}) == []
+    assert plan_orders(0.0, {'LONG': leg(0.2), 'SHORT': leg(-0.2)}, hedge_mode=True) == []
+
+def test_hedge_reduces_opposite_leg_before_opening():
+    orders = plan_orders(0.3, {'LONG': leg(0.0), 'SHORT': leg(-0.5)}, hedge_mode=True)
+    assert orders == [
+        {'side': 'BUY', 'quantity': 0.5, 'position_side': 'SHORT', 'reduce_only': True},
+        {'side': 'BUY', 'quantity': 0.3, 'position_side': 'LONG', 'reduce_only': False},
+    ]
+
+def test_hedge_only_reduces_when_opposite_leg_covers_delta():
+    orders = plan_orders(-0.2, {'LONG': leg(0.5)}, hedge_mode=True)
+    assert orders == [{'side': 'SELL', 'quantity': 0.5, 'position_side': 'LONG', 'reduce_only': True},
+                      {'side': 'SELL', 'quantity': 0.2, 'position_side': 'SHORT', 'reduce_only': False}]
+
+    orders = plan_orders(0.1, {'LONG': leg(0.5)}, hedge_mode=True)
+    assert orders == [{'side': 'SELL', 'quantity': 0.4, 'position_side': 'LONG', 'reduce_only': True}]
+
+def test_hedge_opens_own_leg_without_opposite_position():
+    orders = plan_orders(-0.25, {}, hedge_mode=True)
+    assert orders == [{'side': 'SELL', 'quantity': 0.25, 'position_side': 'SHORT', 'reduce_only': False}]
+
+class FakeClient:
+    def __init__(self, hedge_mode=False, test_mode=False):
+        self.hedge_mode = hedge_mode
+        self.test_mode = test_mode
+        self.orders = []
+
+    def get_positions(self, symbol):
+        return {'BOTH': leg(0.5)}
+
+    def place_order(self, **kwargs):
+        self.orders.append(kwargs)
+        return {'orderId': len(self.orders), 'status': 'NEW'}
+
+class FakeJournal:
+    def __init__(self):
+        self.orders = []
+
+    def record_order(self, *args, **kwargs):
+        self.orders.append((args, kwargs))
+
+def test_route_sends_planned_orders_and_journals_them():
+    client = FakeClient(test_mode=True)
+    router = OrderRouter(client)
+    router.journal = FakeJournal()
+
+    results = router.route('BTCUSDT', -0.5)
+
+    assert client.orders == [{'symbol': 'BTCUSDT', 'side': 'SELL', 'quantity': 1.0,
+                              'reduce_only': False, 'position_side': None}]
+    assert results == [{'orderId': 1, 'status': 'NEW'}]
+    args, kwargs = router.journal.orders[0]
+    assert args[:3] == ('BTCUSDT', 'SELL', 1.0)
+    assert kwargs == {'test': True}
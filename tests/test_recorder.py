@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import json
+import pytest
+from binance.exceptions import BinanceAPIException
+from data.recorder import (Recorder, RecordingClient, read_records, read_sessions, MAGIC, RECORD_HEADER,
+                           KIND_REST, KIND_REST_ERROR, KIND_STREAM, KIND_SESSION, KIND_STATE)
+
+def test_round_trip_preserves_order_kinds_and_payloads(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    recorder = Recorder(path)
+    recorder.record_rest('futures_klines', {'symbol': 'BTCUSDT'}, [[1, '2']])
+    recorder.record_rest_error('futures_account', {}, 400, '{"code": -1021, "msg": "x"}')
+    recorder.record_stream('ticks', '{"e": "aggTrade"}')
+    recorder.record_state('klines', {'BTCUSDT|1m': []})
+    recorder.close()
+
+    records = list(read_records(path))
+
+    assert [kind for kind, _, _ in records] == [KIND_SESSION, KIND_REST, KIND_REST_ERROR, KIND_STREAM, KIND_STATE]
+    assert records[1][2] == {'m': 'futures_klines', 'k': {'symbol': 'BTCUSDT'}, 'r': [[1, '2']]}
+    assert records[2][2]['s'] == 400
+    assert records[3][2] == {'s': 'ticks', 'd': '{"e": "aggTrade"}'}
+    timestamps = [timestamp for _, timestamp, _ in records]
+    assert timestamps == sorted(timestamps)
+
+def test_records_are_flushed_without_further_writes(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    recorder = Recorder(path, flush_interval=0.05)
+    try:
+        recorder.record_rest('ping', {}, {})
+        recorder._closed.wait(0.3)
+        assert [kind for kind, _, _ in read_records(path)] == [KIND_SESSION, KIND_REST]
+    finally:
+        recorder.close()
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    recorder = Recorder(path)
+    recorder.record_rest('ping', {}, {})
+    recorder.record_rest('time', {}, {'serverTime': 1})
+    recorder.close()
+
+    with open(path, 'rb+') as f:
+        f.truncate(f.seek(0, 2) - 3)
+
+    assert [payload.get('m') for _, _, payload in read_records(path)] == [None, 'ping']
+
+def test_invalid_file_is_rejected(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a recording')
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+
+def test_each_run_appends_a_new_session(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    for calls in (2, 1):
+        recorder = Recorder(path)
+        for _ in range(calls):
+            recorder.record_rest('ping', {}, {})
+        recorder.close()
+
+    assert [len(session) for session in read_sessions(path)] == [2, 1]
+
+def test_recordings_without_session_header_are_one_session(tmp_path):
+    path = tmp_path / 'legacy.bin'
+    data = json.dumps({'m': 'ping', 'k': {}, 'r': {}}).encode('utf-8')
+    record = RECORD_HEADER.pack(KIND_REST, 1, len(data)) + data
+    path.write_bytes(MAGIC + record + record)
+
+    assert [len(session) for session in read_sessions(str(path))] == [2]
+
+class FakeClient:
+    def futures_symbol_ticker(self, symbol):
+        return {'symbol': symbol, 'price': '100'}
+
+    def futures_account(self):
+        raise BinanceAPIException(None, 400, '{"code": -2015, "msg": "Invalid API-key"}')
+
+def test_recording_client_records_results_and_exchange_errors(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    recorder = Recorder(path)
+    client = RecordingClient(FakeClient(), recorder)
+
+    assert client.futures_symbol_ticker(symbol='BTCUSDT')['price'] == '100'
+    with pytest.raises(BinanceAPIException):
+        client.futures_account()
+    recorder.close()
+
+    records = read_sessions(path)[0]
+    assert records[0][0] == KIND_REST and records[0][2]['k'] == {'symbol': 'BTCUSDT'}
+    assert records[1][0] == KIND_REST_ERROR and json.loads(records[1][2]['t'])['code'] == -2015
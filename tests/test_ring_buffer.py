@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from utils.ring_buffer import RingBuffer
+
+def filled(capacity, values):
+    buffer = RingBuffer(capacity)
+    for value in values:
+        buffer.append(value)
+    return buffer
+
+def test_partial_buffer():
+    buffer = filled(4, [1, 2])
+
+    assert len(buffer) == 2 and not buffer.is_full()
+    assert buffer.last() == [1, 2]
+    assert buffer.last(5) == [1, 2]
+    assert (buffer[0], buffer[-1]) == (1, 2)
+
+def test_last_after_wrap_around():
+    buffer = filled(4, range(1, 7))
+
+    assert len(buffer) == 4 and buffer.is_full()
+    assert buffer.last() == [3, 4, 5, 6]
+    # El tramo pedido cruza el final de la lista interna
+    assert buffer.last(3) == [4, 5, 6]
+    assert buffer.last(1) == [6]
+    assert buffer.last(0) == []
+
+def test_getitem_after_wrap_around():
+    buffer = filled(4, range(1, 7))
+
+    assert [buffer[i] for i in range(4)] == [3, 4, 5, 6]
+    assert [buffer[-i] for i in range(1, 5)] == [6, 5, 4, 3]
+    for index in (4, -5):
+        with pytest.raises(IndexError):
+            buffer[index]
+
+def test_replace_last_after_wrap_around():
+    buffer = filled(3, range(1, 5))
+
+    buffer.replace_last(40)
+
+    assert buffer.last() == [2, 3, 40] and buffer[-1] == 40
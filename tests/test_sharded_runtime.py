@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import queue
+from config.config import Config
+from core.sharded_runtime import ShardedRuntime, task_key
+
+def drain(control_queue):
+    items = []
+    while not control_queue.empty():
+        items.append(control_queue.get_nowait())
+    return items
+
+def test_moved_task_is_added_only_after_source_confirms():
+    runtime = ShardedRuntime(['A', 'B', 'C'], ['ma'], '1m', Config(), workers=2)
+    runtime.control_queues = [queue.Queue(), queue.Queue()]
+    runtime.assignment = [[('A', 'ma'), ('B', 'ma'), ('C', 'ma')], []]
+    runtime.costs = {'A:ma': 10.0, 'B:ma': 10.0, 'C:ma': 10.0}
+
+    runtime.rebalance()
+
+    removes = drain(runtime.control_queues[0])
+    assert removes and all(command[0] == 'remove' and command[2] == 1 for command in removes)
+    # El destino no recibe nada hasta la confirmación del origen
+    assert drain(runtime.control_queues[1]) == []
+
+    key = removes[0][1]
+    runtime.complete_move(0, key, 1)
+    symbol, strategy = key.split(':')
+    assert drain(runtime.control_queues[1]) == [('add', symbol, strategy)]
+    assert task_key(symbol, strategy) not in runtime.moving
+
+    # Confirmaciones repetidas no duplican la tarea
+    runtime.complete_move(0, key, 1)
+    assert drain(runtime.control_queues[1]) == []
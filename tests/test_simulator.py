@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from binance.exceptions import BinanceAPIException
+import data.simulator as simulator
+from data.recorder import Recorder
+from data.simulator import SimulatedClient
+
+def record(path, calls):
+    recorder = Recorder(path)
+    for method, kwargs, result in calls:
+        if isinstance(result, BinanceAPIException):
+            recorder.record_rest_error(method, kwargs, result.status_code, '{"code": %d, "msg": "x"}' % result.code)
+        else:
+            recorder.record_rest(method, kwargs, result)
+    recorder.close()
+
+def test_responses_are_served_in_recorded_order(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    record(path, [
+        ('futures_symbol_ticker', {'symbol': 'BTCUSDT'}, {'price': '1'}),
+        ('futures_symbol_ticker', {'symbol': 'ETHUSDT'}, {'price': '9'}),
+        ('futures_symbol_ticker', {'symbol': 'BTCUSDT'}, {'price': '2'}),
+    ])
+    client = SimulatedClient(path)
+
+    assert client.futures_symbol_ticker(symbol='BTCUSDT') == {'price': '1'}
+    assert client.futures_symbol_ticker(symbol='BTCUSDT') == {'price': '2'}
+    assert client.futures_symbol_ticker(symbol='ETHUSDT') == {'price': '9'}
+    # Agotada la grabación se repite la última respuesta
+    assert client.futures_symbol_ticker(symbol='BTCUSDT') == {'price': '2'}
+
+def test_recorded_errors_are_raised_as_binance_exceptions(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    record(path, [('futures_account', {}, BinanceAPIException(None, 400, '{"code": -2015, "msg": "x"}'))])
+
+    with pytest.raises(BinanceAPIException) as error:
+        SimulatedClient(path).futures_account()
+    assert error.value.code == -2015
+
+def test_unrecorded_calls(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    record(path, [('ping', {}, {})])
+    client = SimulatedClient(path)
+
+    assert client.futures_create_order(symbol='BTCUSDT', side='BUY')['orderId'] == 'sim-1'
+    with pytest.raises(BinanceAPIException):
+        client.futures_account()
+
+def test_last_session_and_state_are_replayed(tmp_path):
+    path = str(tmp_path / 'session.bin')
+    record(path, [('futures_symbol_ticker', {}, {'price': 'old'})])
+    recorder = Recorder(path)
+    recorder.record_state('klines', {'BTCUSDT|1m': [{'timestamp': 0}]})
+    recorder.record_rest('futures_symbol_ticker', {}, {'price': 'new'})
+    recorder.close()
+
+    client = SimulatedClient(path)
+    assert client.futures_symbol_ticker() == {'price': 'new'}
+    assert client.states == {'klines': {'BTCUSDT|1m': [{'timestamp': 0}]}}
+    assert SimulatedClient(path, session=0).futures_symbol_ticker() == {'price': 'old'}
+
+def test_jitter_is_deterministic_for_a_seed(tmp_path, monkeypatch):
+    path = str(tmp_path / 'session.bin')
+    record(path, [('ping', {}, {})])
+
+    def delays(seed):
+        slept = []
+        monkeypatch.setattr(simulator.time, 'sleep', slept.append)
+        client = SimulatedClient(path, latency_ms=1.0, jitter_ms=5.0, seed=seed)
+        for _ in range(5):
+            client.ping()
+        return slept
+
+    first = delays(1)
+    assert first == delays(1)
+    assert first != delays(2)
+    assert all(0.001 <= delay <= 0.006 for delay in first)
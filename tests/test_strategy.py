@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from core.strategy import Strategy
+
+class FixedSizeStrategy(Strategy):
+    def __init__(self, client, size):
+        super().__init__(client, 'BTCUSDT', '1m')
+        self.size = size
+
+    def analyze(self):
+        return None
+
+    def calculate_position_size(self, signal):
+        return self.size
+
+class FakeClient:
+    hedge_mode = False
+    test_mode = True
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.orders = []
+
+    def get_positions(self, symbol):
+        return self.positions
+
+    def place_order(self, **kwargs):
+        self.orders.append(kwargs)
+        return {'orderId': 1, 'status': 'NEW'}
+
+def test_signal_opens_target_exposure():
+    client = FakeClient({})
+    FixedSizeStrategy(client, 0.5).execute_signal('BUY')
+    assert [(order['side'], order['quantity']) for order in client.orders] == [('BUY', 0.5)]
+
+def test_signal_is_skipped_without_positions():
+    # GatewayClient devuelve None cuando el gateway no responde
+    client = FakeClient(None)
+    FixedSizeStrategy(client, 0.5).execute_signal('BUY')
+    assert client.orders == []
+
+def test_signal_is_skipped_without_position_size():
+    # Un tamaño 0 (sin balance o precio) no debe cerrar la posición contraria
+    client = FakeClient({'BOTH': {'amount': -0.3}})
+    FixedSizeStrategy(client, 0).execute_signal('BUY')
+    assert client.orders == []
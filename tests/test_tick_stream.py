@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from core.tick_stream import MicroBarAggregator, parse_tick
+
+def test_parse_agg_trade_from_combined_stream():
+    message = {'stream': 'btcusdt@aggTrade', 'data': {
+        'e': 'aggTrade', 'E': 2, 's': 'BTCUSDT', 'p': '100.5', 'q': '0.25', 'T': 1, 'm': True
+    }}
+
+    assert parse_tick(message) == {
+        'type': 'trade', 'symbol': 'BTCUSDT', 'price': 100.5, 'quantity': 0.25, 'time': 1, 'buyer_maker': True
+    }
+
+def test_parse_book_ticker():
+    message = {'e': 'bookTicker', 'E': 5, 's': 'ETHUSDT', 'b': '10', 'B': '1.5', 'a': '11', 'A': '2'}
+
+    assert parse_tick(message) == {
+        'type': 'book', 'symbol': 'ETHUSDT', 'bid': 10.0, 'bid_qty': 1.5, 'ask': 11.0, 'ask_qty': 2.0, 'time': 5
+    }
+    assert parse_tick(dict(message, T=4))['time'] == 4
+
+def test_parse_unsupported_event():
+    assert parse_tick({'e': 'markPriceUpdate', 's': 'BTCUSDT'}) is None
+
+def test_trades_are_aggregated_into_bars():
+    bars = MicroBarAggregator(bar_ms=1000)
+
+    assert bars.update(100.0, 1.0, 1000) is False
+    assert bars.update(103.0, 0.5, 1200) is False
+    assert bars.update(98.0, 0.5, 1999) is False
+    assert bars.update(101.0, 2.0, 2500) is True
+
+    assert len(bars) == 2
+    assert bars.timestamps.last() == [1000, 2000]
+    assert (bars.opens[0], bars.highs[0], bars.lows[0], bars.closes[0], bars.volumes[0]) == (100.0, 103.0, 98.0, 98.0, 2.0)
+    assert (bars.opens[-1], bars.highs[-1], bars.lows[-1], bars.closes[-1], bars.volumes[-1]) == (101.0, 101.0, 101.0, 101.0, 2.0)
+
+def test_bars_keep_only_capacity():
+    bars = MicroBarAggregator(bar_ms=100, capacity=3)
+
+    for i in range(5):
+        bars.update(float(i), 1.0, i * 100)
+
+    assert len(bars) == 3
+    assert bars.timestamps.last() == [200, 300, 400]
+    assert bars.closes.last() == [2.0, 3.0, 4.0]
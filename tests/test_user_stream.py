@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import json
+from core.user_stream import AccountState, replay_events
+
+ACCOUNT = {'assets': [{'asset': 'USDT', 'walletBalance': '1000', 'crossWalletBalance': '1000',
+                       'availableBalance': '800', 'updateTime': 1000}]}
+POSITIONS = [{'symbol': 'BTCUSDT', 'positionSide': 'BOTH', 'leverage': '2', 'positionAmt': '0',
+              'entryPrice': '0', 'unRealizedProfit': '0', 'updateTime': 1000}]
+
+def account_update(event_time, amount, wallet='1000'):
+    return {'e': 'ACCOUNT_UPDATE', 'E': event_time, 'a': {
+        'm': 'ORDER',
+        'B': [{'a': 'USDT', 'wb': wallet, 'cw': wallet}],
+        'P': [{'s': 'BTCUSDT', 'ps': 'BOTH', 'pa': str(amount), 'ep': '100', 'up': '0'}]
+    }}
+
+def order_update(order_id, status, execution_type='NEW', filled='0'):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': 3000, 'o': {
+        's': 'BTCUSDT', 'i': order_id, 'c': 'x', 'S': 'BUY', 'ps': 'BOTH', 'o': 'LIMIT', 'X': status,
+        'x': execution_type, 'q': '0.5', 'p': '100', 'z': filled, 'l': filled, 'L': '100',
+        'rp': '0', 'n': '0.01', 'R': False, 'T': 3000
+    }}
+
+def write_events(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+def test_replay_applies_snapshot_then_events(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    write_events(path, [
+        {'snapshot': {'account': ACCOUNT, 'positions': POSITIONS}},
+        account_update(2000, 0.5, wallet='990'),
+        order_update(7, 'NEW'),
+    ])
+
+    state = replay_events(str(path))
+
+    assert state.get_position('BTCUSDT')['amount'] == 0.5
+    assert state.balances['USDT']['wallet_balance'] == 990.0
+    assert [order['order_id'] for order in state.get_open_orders('BTCUSDT')] == [7]
+    assert state.last_event_time == 3000
+
+def test_events_older_than_snapshot_are_discarded(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    write_events(path, [
+        {'snapshot': {'account': ACCOUNT, 'positions': POSITIONS}},
+        account_update(500, 0.5),
+    ])
+
+    state = replay_events(str(path))
+
+    assert state.get_position('BTCUSDT')['amount'] == 0.0
+    assert state.get_available_balance() == 800.0
+
+def test_filled_orders_leave_open_orders():
+    state = AccountState()
+    state.load_snapshot(ACCOUNT, POSITIONS)
+    state.apply_event(order_update(7, 'NEW'))
+    state.apply_event(order_update(7, 'FILLED', 'TRADE', filled='0.5'))
+    assert state.get_open_orders() == []
+
+def test_listeners_receive_applied_events():
+    state = AccountState()
+    received = []
+    state.add_listener(lambda event_type, data: received.append((event_type, data['order_id'])))
+    state.apply_event(order_update(7, 'NEW'))
+    assert received == [('ORDER_TRADE_UPDATE', 7)]
+
+def test_available_balance_is_unknown_until_resync_after_position_change():
+    state = AccountState()
+    state.load_snapshot(ACCOUNT, POSITIONS)
+    assert state.get_available_balance() == 800.0
+
+    state.apply_event(account_update(2000, 0.5))
+    assert state.get_available_balance() is None
+
+    state.load_snapshot(ACCOUNT, POSITIONS)
+    assert state.get_available_balance() == 800.0
+
+def test_events_during_resync_survive_an_older_snapshot():
+    state = AccountState()
+    state.load_snapshot(ACCOUNT, POSITIONS)
+
+    state.begin_resync()
+    state.apply_event(account_update(2000, 0.5))
+    # El snapshot se descargó antes del evento
+    state.load_snapshot(ACCOUNT, POSITIONS)
+
+    assert state.get_position('BTCUSDT')['amount'] == 0.5
+
+def test_cancelled_resync_stops_buffering():
+    state = AccountState()
+    state.begin_resync()
+    state.cancel_resync()
+    state.apply_event(account_update(2000, 0.5))
+    state.load_snapshot(ACCOUNT, POSITIONS)
+    assert state.get_position('BTCUSDT')['amount'] == 0.0
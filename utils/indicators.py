@@ -150,3 +150,35 @@ def calculate_atr(high, low, close, period=14):
     atr = tr.rolling(window=period).mean()
     
     return atr
+
+
+class StreamingEMA:
+    """EMA incremental para evaluar tick a tick sin recalcular la serie"""
+
+    __slots__ = ('period', 'alpha', 'value', 'count')
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+        self.count = 0
+
+    def update(self, price):
+        """
+        Añade un precio y devuelve la EMA actual
+
+        Args:
+            price: Nuevo precio
+
+        Returns:
+            float: Valor de la EMA
+        """
+        if self.value is None:
+            self.value = price
+        else:
+            self.value += self.alpha * (price - self.value)
+        self.count += 1
+        return self.value
+
+    def is_ready(self):
+        return self.count >= self.period
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+class RingBuffer:
+    """Buffer circular de tamaño fijo con inserción O(1) y sin reasignaciones"""
+
+    __slots__ = ('capacity', '_data', '_index', '_size')
+
+    def __init__(self, capacity, fill=0.0):
+        """
+        Inicializa el buffer
+
+        Args:
+            capacity: Número máximo de elementos
+            fill: Valor inicial de las posiciones vacías
+        """
+        self.capacity = capacity
+        self._data = [fill] * capacity
+        self._index = 0
+        self._size = 0
+
+    def append(self, value):
+        """Añade un valor sobrescribiendo el más antiguo si el buffer está lleno"""
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def replace_last(self, value):
+        """Sustituye el último valor añadido"""
+        self._data[(self._index - 1) % self.capacity] = value
+
+    def last(self, n=None):
+        """
+        Devuelve los últimos n valores en orden cronológico
+
+        Args:
+            n: Cantidad de valores (todos si no se indica)
+
+        Returns:
+            list: Valores del más antiguo al más reciente
+        """
+        n = self._size if n is None else min(n, self._size)
+        start = (self._index - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n]
+        return self._data[start:] + self._data[:start + n - self.capacity]
+
+    def __getitem__(self, i):
+        """Acceso por índice cronológico; los índices negativos cuentan desde el más reciente"""
+        if i < 0:
+            i += self._size
+        if i < 0 or i >= self._size:
+            raise IndexError('RingBuffer index out of range')
+        return self._data[(self._index - self._size + i) % self.capacity]
+
+    def __len__(self):
+        return self._size
+
+    def is_full(self):
+        return self._size == self.capacity